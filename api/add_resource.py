@@ -5,26 +5,25 @@ Interactive script to add a single resource to the database
 import uuid
 import psycopg
 from psycopg.rows import dict_row
-from geopy.geocoders import GoogleV3
-from datetime import datetime
 import os
 import sys
 sys.path.append(os.path.dirname(__file__))
 
 from env import SUPABASE_POSTGRES_URL
+from geocoding import geocode
 
 # Get API key from environment
 GOOGLE_MAPS_API_KEY = os.getenv("GOOGLE_MAPS_API_KEY")
 
-def geocode_location(geocoder, location_text):
+def geocode_location(location_text):
     """Geocode a location to get coordinates"""
-    if not geocoder:
+    if not GOOGLE_MAPS_API_KEY:
         return None, None
 
     try:
-        location = geocoder.geocode(location_text)
-        if location:
-            return location.latitude, location.longitude
+        lat, lng = geocode(location_text)
+        if lat is not None:
+            return lat, lng
         else:
             print(f"  ⚠️  Could not geocode: {location_text}")
             return None, None
@@ -32,24 +31,20 @@ def geocode_location(geocoder, location_text):
         print(f"  ❌ Geocoding error: {e}")
         return None, None
 
-def main():
-    print("=" * 80)
-    print("ADD EMERGENCY RESOURCE - Interactive")
-    print("=" * 80)
-    print("\nThis tool helps you add a new emergency resource to the database.\n")
-
+def add_one_resource(conn):
+    """Prompt for one resource, geocode it and insert it. Returns False if the user bailed out."""
     # Collect resource information
     print("📝 Enter resource details:\n")
 
     name = input("Resource name (e.g., 'Field Hospital Alpha'): ").strip()
     if not name:
         print("❌ Name is required")
-        return
+        return False
 
     location = input("Location (e.g., 'Houston Convention Center, Texas'): ").strip()
     if not location:
         print("❌ Location is required")
-        return
+        return False
 
     print("\nDescription (press Enter twice when done):")
     description_lines = []
@@ -87,78 +82,82 @@ def main():
     confirm = input("\nAdd this resource to the database? (y/n): ")
     if confirm.lower() != 'y':
         print("Cancelled.")
-        return
-
-    # Initialize geocoder
-    geocoder = GoogleV3(api_key=GOOGLE_MAPS_API_KEY) if GOOGLE_MAPS_API_KEY else None
+        return False
 
     # Geocode location
     print("\n🌍 Geocoding location...")
-    lat, lng = geocode_location(geocoder, location)
+    lat, lng = geocode_location(location)
     if lat and lng:
         print(f"   📍 Found coordinates: {lat:.6f}, {lng:.6f}")
     else:
         print("   ⚠️  No coordinates available (geocoding failed or API key missing)")
 
     # Add to database
-    try:
-        with psycopg.connect(SUPABASE_POSTGRES_URL, row_factory=dict_row) as conn:
-            with conn.cursor() as cur:
-                resource_id = str(uuid.uuid4())
-
-                print("\n💾 Adding to database...")
-                cur.execute(
-                    """
-                    INSERT INTO resource (
-                        id, name, description, location,
-                        latitude, longitude, capacity, status, created_at
-                    )
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    RETURNING id, maps_url
-                    """,
-                    (
-                        resource_id,
-                        name,
-                        description,
-                        location,
-                        lat,
-                        lng,
-                        capacity,
-                        status,
-                        datetime.utcnow()
-                    )
-                )
-
-                result = cur.fetchone()
-                print(f"✅ Resource created with ID: {result['id'][:8]}...")
-
-                if result.get('maps_url'):
-                    print(f"🗺️  Map: {result['maps_url']}")
-
-                # Log event
-                event_id = str(uuid.uuid4())
-                event_desc = f"Resource added: {name} at {location}"
-                if capacity:
-                    event_desc += f" (capacity: {capacity})"
-
-                cur.execute(
-                    """
-                    INSERT INTO event (id, timestamp, description, latitude, longitude)
-                    VALUES (%s, %s, %s, %s, %s)
-                    """,
-                    (event_id, datetime.utcnow(), event_desc, lat, lng)
+    event_desc = f"Resource added: {name} at {location}"
+    if capacity:
+        event_desc += f" (capacity: {capacity})"
+
+    with conn.cursor() as cur:
+        print("\n💾 Adding to database...")
+        # Resource and its log event go in one statement, one round-trip.
+        # created_at / timestamp use the column defaults (now()).
+        cur.execute(
+            """
+            WITH new_resource AS (
+                INSERT INTO resource (
+                    id, name, description, location,
+                    latitude, longitude, capacity, status
                 )
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                RETURNING id, maps_url
+            ), new_event AS (
+                INSERT INTO event (id, description, latitude, longitude)
+                VALUES (%s, %s, %s, %s)
+            )
+            SELECT id, maps_url FROM new_resource
+            """,
+            (
+                str(uuid.uuid4()),
+                name,
+                description,
+                location,
+                lat,
+                lng,
+                capacity,
+                status,
+                str(uuid.uuid4()),
+                event_desc,
+                lat,
+                lng,
+            )
+        )
+
+        result = cur.fetchone()
+        print(f"✅ Resource created with ID: {result['id'][:8]}...")
+
+        if result.get('maps_url'):
+            print(f"🗺️  Map: {result['maps_url']}")
+
+    conn.commit()
+    print("\n✅ Successfully added resource to database!")
+    return True
 
-                conn.commit()
-                print("\n✅ Successfully added resource to database!")
+def main():
+    print("=" * 80)
+    print("ADD EMERGENCY RESOURCE - Interactive")
+    print("=" * 80)
+    print("\nThis tool helps you add a new emergency resource to the database.\n")
 
+    try:
+        # One connection for the whole session, however many resources are added
+        with psycopg.connect(SUPABASE_POSTGRES_URL, row_factory=dict_row) as conn:
+            while add_one_resource(conn):
                 # Ask if they want to add another
                 another = input("\nWould you like to add another resource? (y/n): ")
-                if another.lower() == 'y':
-                    print("\n" + "=" * 80 + "\n")
-                    main()  # Recursive call
-                else:
+                if another.lower() != 'y':
                     print("\n💡 Tip: Run 'python3 view_resources.py' to see all resources")
+                    break
+                print("\n" + "=" * 80 + "\n")
 
     except Exception as e:
         print(f"\n❌ Database error: {e}")
@@ -2,26 +2,188 @@
 Emergency Response AI Agent using LangChain and Gemini
 """
 
+import asyncio
+import hashlib
 import os
-import json
-import uuid
-from datetime import datetime
-from typing import Dict, List, Optional, Tuple
-import psycopg
-from psycopg.rows import dict_row
+import re
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, Final, List, Optional, Set, Tuple
+import orjson
+from google.api_core.exceptions import GoogleAPIError
 from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_google_genai.chat_models import ChatGoogleGenerativeAIError
+from langchain_core.exceptions import OutputParserException
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from pydantic import BaseModel
-from geopy.geocoders import GoogleV3
+from pydantic import BaseModel, Field, ValidationError
 from geopy.exc import GeocoderTimedOut, GeocoderServiceError
 
 import logging
 
-from env import GOOGLE_API_KEY, GOOGLE_MAPS_API_KEY
+from db import get_pool, invalidate_reads
+from env import GEMINI_MAX_CONCURRENCY, GOOGLE_API_KEY, GOOGLE_MAPS_API_KEY
+from extraction_gate import should_extract
+from geocoding import geocode
 
 logger = logging.getLogger("uvicorn.error")
 
+# Exact-match cache of parsed extraction results, keyed by a hash of the rendered conversation.
+# Repeated conversations (Twilio webhook retries, resubmitted chats) skip the LLM call.
+_EXTRACTION_CACHE_SIZE = 1024
+_extraction_cache: "OrderedDict[str, Dict]" = OrderedDict()
+
+
+def _get_cached_extraction(key: str) -> Optional[Dict]:
+    data = _extraction_cache.get(key)
+    if data is not None:
+        _extraction_cache.move_to_end(key)
+    return data
+
+
+def _cache_extraction(key: str, data: Dict) -> None:
+    _extraction_cache[key] = data
+    _extraction_cache.move_to_end(key)
+    if len(_extraction_cache) > _EXTRACTION_CACHE_SIZE:
+        _extraction_cache.popitem(last=False)
+
+
+# How many trailing turns to look back for a cached extraction to update incrementally
+# (one user message plus the assistant reply before it, with slack for a skipped turn)
+_EXTRACTION_LOOKBACK_TURNS = 4
+
+
+def _conversation_prefix_keys(lines: List[str]) -> List[str]:
+    """Cache keys for every prefix of the conversation: keys[k] hashes the first k + 1 lines"""
+    digest = hashlib.sha256()
+    keys = []
+    for i, line in enumerate(lines):
+        if i:
+            digest.update(b"\n")
+        digest.update(line.encode("utf-8"))
+        keys.append(digest.copy().hexdigest())
+    return keys
+
+
+# DEMO MODE: Use very large radius
+RESPONDER_ALERT_RADIUS_KM = 500.0  # 500km to cover all of Northern Sweden for demo
+
+# Fallback coordinates for known demo locations
+DEMO_LOCATIONS: Final[Dict[str, Tuple[float, float]]] = {
+    "stf vakkotavare": (67.58170, 18.10040),
+    "vakkotavare": (67.58170, 18.10040),
+    "stf vakkotavare hut": (67.58170, 18.10040),
+    "stockholm": (59.3293, 18.0686),
+    "gothenburg": (57.7089, 11.9746),
+    "göteborg": (57.7089, 11.9746),
+    "malmö": (55.6049, 13.0038),
+    "uppsala": (59.8586, 17.6389),
+}
+# One scan over the text for any demo location; longest names first so "stf vakkotavare hut" beats "vakkotavare"
+_DEMO_LOCATION_RE = re.compile(
+    "|".join(re.escape(name) for name in sorted(DEMO_LOCATIONS, key=len, reverse=True)),
+    re.IGNORECASE,
+)
+
+# Upper bound on the concurrent reply + extraction LLM calls for one message
+LLM_TURN_TIMEOUT_SECONDS = 15
+
+# Caps in-flight Gemini requests across all conversations in this process, so bursts queue here
+# instead of tripping 429s and the client's retry backoff
+_llm_semaphore = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+
+
+def _block_text(block) -> str:
+    """Text of one Gemini content block: plain strings pass through, dict blocks carry it under "text"."""
+    if isinstance(block, str):
+        return block
+    if isinstance(block, dict):
+        return block.get("text", "")
+    return str(block)
+
+
+async def _ainvoke_limited(runnable, messages):
+    """runnable.ainvoke(messages), waiting for a free Gemini slot first"""
+    async with _llm_semaphore:
+        return await runnable.ainvoke(messages)
+
+# Background responder-alert tasks, held here so they aren't garbage collected mid-flight
+_alert_tasks: Set[asyncio.Task] = set()
+
+
+async def _alert_responders(db_url: str, emergency_dict: Dict, case_id: str) -> None:
+    """Find and text nearby responders off the request path; the outcome is only logged."""
+    from responder_notifier import alert_nearby_help
+
+    try:
+        result = await asyncio.to_thread(
+            alert_nearby_help,
+            db_url,
+            emergency_dict,
+            case_id,
+            radius_km=RESPONDER_ALERT_RADIUS_KM,
+            max_responders=10,  # Allow more responders for demo
+        )
+    except Exception:
+        logger.exception("responder_alert_failed case_id=%s", case_id)
+        return
+
+    if result["notifications_sent"] > 0:
+        logger.info(
+            "responder_alert_sent case_id=%s notified=%s",
+            case_id,
+            result["notifications_sent"],
+        )
+    elif result["responders_found"] > 0:
+        logger.warning(
+            "responder_alert_sms_failed case_id=%s found=%s (check Twilio/phone numbers)",
+            case_id,
+            result["responders_found"],
+        )
+    else:
+        logger.warning(
+            "responder_alert_none_found case_id=%s radius_km=%s",
+            case_id,
+            RESPONDER_ALERT_RADIUS_KM,
+        )
+
+
+def _schedule_responder_alert(db_url: str, emergency_dict: Dict, case_id: str) -> None:
+    task = asyncio.create_task(_alert_responders(db_url, emergency_dict, case_id))
+    _alert_tasks.add(task)
+    task.add_done_callback(_alert_tasks.discard)
+
+
+# Identical on every turn and listed first, so the reply prompt keeps a stable prefix that
+# Gemini's implicit context cache can reuse across requests
+EMERGENCY_SYSTEM_PROMPT = """You are an emergency response AI assistant. Your job is to gather critical information from people in emergency situations.
+
+You need to collect the following information:
+1. Full name
+2. Social security number (for identification)
+3. Current location (as specific as possible)
+4. Description of the emergency/problem
+
+Be compassionate but efficient. Ask for remaining information if not provided. Once you have all required information, confirm it with the person.
+
+When categorizing emergencies, use these categories:
+- fuel: Out of fuel, gas, vehicle fuel issues
+- medical: Injuries, illness, medical emergencies, allergic reactions, anaphylaxis
+- shelter: Need for shelter, stuck in dangerous weather
+- food_water: Need for food or water
+- rescue: Trapped, lost, need extraction
+- other: Anything else
+
+Rate severity from 1-5:
+- 5: Life-threatening, immediate danger (anaphylaxis, heart attack, severe bleeding)
+- 4: Urgent, serious risk (severe allergic reaction, difficulty breathing)
+- 3: Moderate urgency
+- 2: Low urgency
+- 1: Minor issue
+
+IMPORTANT: For any allergic reaction or mention of EpiPen, categorize as "medical" with severity 4-5
+
+Remember: Be professional, calm, and reassuring. People are in distress."""
+
 
 class EmergencyInfo(BaseModel):
     """Extracted emergency information"""
@@ -42,7 +204,74 @@ class EmergencyInfo(BaseModel):
     recommended_action: Optional[str] = None
 
 
+class ConversationExtraction(BaseModel):
+    """Schema Gemini fills in from a conversation (structured output); the subset of EmergencyInfo the user supplies"""
+
+    full_name: Optional[str] = Field(None, description="Full name of the person in need")
+    social_security_number: Optional[str] = Field(None, description="Social security number")
+    location: Optional[str] = Field(None, description="Where the person is, as specific as given")
+    emergency_description: Optional[str] = Field(None, description="What the emergency or problem is")
+    category: Optional[str] = Field(
+        None, description="One of fuel, medical, shelter, food_water, rescue, other"
+    )
+    severity: Optional[int] = Field(None, description="Severity from 1 (minor) to 5 (life-threatening)")
+
+
 class EmergencyAgent:
+    # Prompt templates are built once at import and shared by every agent (one is created per request)
+    reply_prompt = ChatPromptTemplate.from_messages(
+        [
+            SystemMessage(content=EMERGENCY_SYSTEM_PROMPT),
+            MessagesPlaceholder("history"),
+            ("human", "{message}"),
+        ]
+    )
+    extract_prompt = ChatPromptTemplate.from_messages(
+        [
+            SystemMessage(
+                content="You are an information extraction assistant. Extract structured data from conversations."
+            ),
+            (
+                "human",
+                """Based on the conversation below, extract the following information:
+    - Full name
+    - Social security number
+    - Location
+    - Emergency description
+    - Category (fuel/medical/shelter/food_water/rescue/other) - use "medical" for any allergic reactions
+    - Severity (1-5) - use 4-5 for allergic reactions requiring EpiPen
+
+    Conversation:
+    {conversation}
+
+    If any information is not available, use null for that field.""",
+            ),
+        ]
+    )
+    # Slot-filling: the previous turn's extraction plus only the turns since, so the prompt
+    # stays the same size however long the conversation gets
+    update_extract_prompt = ChatPromptTemplate.from_messages(
+        [
+            SystemMessage(
+                content="You are an information extraction assistant. Keep structured emergency data up to date as a conversation continues."
+            ),
+            (
+                "human",
+                """Information extracted from the conversation so far:
+    {current}
+
+    New messages:
+    {new_turns}
+
+    Return the updated information: full name, social security number, location, emergency description,
+    category (fuel/medical/shelter/food_water/rescue/other; "medical" for any allergic reactions) and
+    severity (1-5; 4-5 for allergic reactions requiring EpiPen).
+    Keep existing values unless the new messages add to or contradict them. Use null for anything still unknown.""",
+            ),
+        ]
+    )
+    triage_system_message = SystemMessage(content="You are a triage analyst. Return only valid JSON.")
+
     def __init__(self, supabase_url: str):
         self.supabase_url = supabase_url
         self.llm = ChatGoogleGenerativeAI(
@@ -52,159 +281,144 @@ class EmergencyAgent:
             timeout=None,
             max_retries=2,
         )
-        self.geocoder = GoogleV3(api_key=GOOGLE_MAPS_API_KEY)
-
-        self.system_prompt = """You are an emergency response AI assistant. Your job is to gather critical information from people in emergency situations.
-
-You need to collect the following information:
-1. Full name
-2. Social security number (for identification)
-3. Current location (as specific as possible)
-4. Description of the emergency/problem
-
-Be compassionate but efficient. Ask for remaining information if not provided. Once you have all required information, confirm it with the person.
-
-When categorizing emergencies, use these categories:
-- fuel: Out of fuel, gas, vehicle fuel issues
-- medical: Injuries, illness, medical emergencies, allergic reactions, anaphylaxis
-- shelter: Need for shelter, stuck in dangerous weather
-- food_water: Need for food or water
-- rescue: Trapped, lost, need extraction
-- other: Anything else
 
-Rate severity from 1-5:
-- 5: Life-threatening, immediate danger (anaphylaxis, heart attack, severe bleeding)
-- 4: Urgent, serious risk (severe allergic reaction, difficulty breathing)
-- 3: Moderate urgency
-- 2: Low urgency
-- 1: Minor issue
+        self.system_prompt = EMERGENCY_SYSTEM_PROMPT
 
-IMPORTANT: For any allergic reaction or mention of EpiPen, categorize as "medical" with severity 4-5
-
-Remember: Be professional, calm, and reassuring. People are in distress."""
+        # Gemini's native structured output returns a typed object: no markdown fences to strip or JSON to parse
+        self.extract_llm = self.llm.with_structured_output(ConversationExtraction)
 
     def geocode_location(
         self, location_text: str
     ) -> Tuple[Optional[float], Optional[float]]:
         """Geocode a location description to get latitude and longitude"""
         if not location_text:
-            print(f"DEBUG geocode_location: No location text provided")
+            logger.debug("geocode_location_skipped reason=no_location_text")
             return None, None
 
-        print(f"DEBUG geocode_location: Attempting to geocode '{location_text}'")
-
-        # Fallback coordinates for known demo locations
-        DEMO_LOCATIONS = {
-            "stf vakkotavare": (67.58170, 18.10040),
-            "vakkotavare": (67.58170, 18.10040),
-            "stf vakkotavare hut": (67.58170, 18.10040),
-            "stockholm": (59.3293, 18.0686),
-            "gothenburg": (57.7089, 11.9746),
-            "göteborg": (57.7089, 11.9746),
-            "malmö": (55.6049, 13.0038),
-            "uppsala": (59.8586, 17.6389),
-        }
+        logger.debug("geocode_location location=%r", location_text)
 
-        # Check for known demo locations first (case-insensitive)
-        location_lower = location_text.lower()
-        for known_location, coords in DEMO_LOCATIONS.items():
-            if known_location in location_lower:
-                print(f"DEMO MODE: Using hardcoded coordinates for '{location_text}': {coords[0]}, {coords[1]}")
-                return coords
+        # Check for known demo locations first (case-insensitive): an exact name is a single
+        # dict probe, anything longer falls back to the regex scan
+        coords = DEMO_LOCATIONS.get(location_text.strip().lower())
+        if coords is None:
+            match = _DEMO_LOCATION_RE.search(location_text)
+            if match:
+                coords = DEMO_LOCATIONS[match.group(0).lower()]
+        if coords is not None:
+            logger.debug("geocode_location_demo location=%r lat=%s lng=%s", location_text, coords[0], coords[1])
+            return coords
 
         try:
             if not GOOGLE_MAPS_API_KEY:
-                print(f"WARNING: GOOGLE_MAPS_API_KEY is not set! Using fallback demo coordinates.")
+                logger.warning("geocode_location_fallback reason=GOOGLE_MAPS_API_KEY_unset")
                 # Default to Stockholm for demo if no specific location match
                 return 59.3293, 18.0686
 
-            location = self.geocoder.geocode(location_text)
-            if location:
-                print(
-                    f"SUCCESS: Geocoded '{location_text}' to: {location.latitude}, {location.longitude}"
-                )
-                return location.latitude, location.longitude
+            lat, lng = geocode(location_text)
+            if lat is not None:
+                logger.debug("geocode_location_ok location=%r lat=%s lng=%s", location_text, lat, lng)
+                return lat, lng
             else:
-                print(f"WARNING: Geocoding returned no results for '{location_text}'")
+                logger.warning("geocode_location_no_results location=%r", location_text)
         except (GeocoderTimedOut, GeocoderServiceError) as e:
-            print(f"ERROR: Geocoding service error for '{location_text}': {e}")
-        except Exception as e:
-            print(f"ERROR: Unexpected geocoding error for '{location_text}': {e}")
-            import traceback
-            print(f"Traceback: {traceback.format_exc()}")
+            logger.warning("geocode_location_service_error location=%r error=%s", location_text, e)
+        except Exception:
+            logger.exception("geocode_location_failed location=%r", location_text)
 
         # Fallback to Stockholm coordinates for demo
-        print(f"FALLBACK: Using default Stockholm coordinates for demo")
+        logger.info("geocode_location_fallback location=%r", location_text)
         return 59.3293, 18.0686
 
-    def extract_info_from_conversation(self, messages: List[Dict]) -> EmergencyInfo:
+    async def extract_info_from_conversation(self, messages: List[Dict]) -> EmergencyInfo:
         """Extract structured information from the conversation"""
-        # Create a prompt to extract information
-        extraction_prompt = f"""Based on the conversation below, extract the following information:
-        - Full name
-        - Social security number
-        - Location
-        - Emergency description
-        - Category (fuel/medical/shelter/food_water/rescue/other) - use "medical" for any allergic reactions
-        - Severity (1-5) - use 4-5 for allergic reactions requiring EpiPen
-
-        Conversation:
-        {json.dumps(messages, indent=2)}
-
-        Return as JSON with keys: full_name, social_security_number, location, emergency_description, category, severity
-        If any information is not available, use null for that field."""
-
-        response = self.llm.invoke(
-            [
-                SystemMessage(
-                    content="You are an information extraction assistant. Extract structured data from conversations."
-                ),
-                HumanMessage(content=extraction_prompt),
-            ]
-        )
-
+        # One "role: content" line per turn; JSON adds tokens without helping the model
+        lines = [f"{m['role']}: {m['content']}" for m in messages]
+        if not lines:
+            return EmergencyInfo()
+        prefix_keys = _conversation_prefix_keys(lines)
+
+        cache_key = prefix_keys[-1]
+        data = _get_cached_extraction(cache_key)
+        if data is None:
+            prompt = None
+            previous = None
+            # Update an earlier turn's extraction with just the newer messages when we have one
+            for k in range(len(lines) - 1, max(0, len(lines) - 1 - _EXTRACTION_LOOKBACK_TURNS), -1):
+                previous = _get_cached_extraction(prefix_keys[k - 1])
+                if previous is not None:
+                    prompt = self.update_extract_prompt.format_messages(
+                        current=orjson.dumps(
+                            {field: previous.get(field) for field in ConversationExtraction.model_fields}
+                        ).decode(),
+                        new_turns="\n".join(lines[k:]),
+                    )
+                    break
+            if prompt is None:
+                prompt = self.extract_prompt.format_messages(conversation="\n".join(lines))
+            # Transient Gemini errors (429/503) are already retried with backoff by the client (max_retries);
+            # one that outlasts the retries leaves this turn without extracted info, like bad output does
+            try:
+                extraction = await _ainvoke_limited(self.extract_llm, prompt)
+            except OutputParserException as e:
+                logger.warning("extract_info_invalid_output error=%s", e)
+                return EmergencyInfo()
+            except (GoogleAPIError, ChatGoogleGenerativeAIError) as e:
+                logger.warning("extract_info_provider_error error=%s", e)
+                return EmergencyInfo()
+            if extraction is None:
+                logger.warning("extract_info_empty_output")
+                return EmergencyInfo()
+            data = extraction.model_dump()
+            # Same location as last turn: carry its coordinates over rather than geocoding again
+            if (
+                previous is not None
+                and previous.get("latitude") is not None
+                and previous.get("location") == data.get("location")
+            ):
+                data["latitude"] = previous["latitude"]
+                data["longitude"] = previous["longitude"]
+            _cache_extraction(cache_key, data)
+
+        # Guarded so the JSON is only serialized when debug logging is actually on
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("extract_info_data data=%s", orjson.dumps(data).decode())
         try:
-            # Handle both string and list response formats from Gemini
-            if isinstance(response.content, list):
-                # Extract text from content blocks
-                content = "".join(
-                    block.get("text", "") if isinstance(block, dict) else str(block)
-                    for block in response.content
-                ).strip()
-            else:
-                content = str(response.content).strip()
-
-            # Remove markdown code blocks if present
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.startswith("```"):
-                content = content[3:]
-            if content.endswith("```"):
-                content = content[:-3]
-
-            data = json.loads(content.strip())
-            print(f"DEBUG: Extracted data from conversation: {json.dumps(data, indent=2)}")
             info = EmergencyInfo(**data)
+        except ValidationError as e:
+            logger.warning("extract_info_validation_error error=%s", e)
+            return EmergencyInfo()
 
-            # Geocode the location if provided
-            if info.location:
-                print(f"DEBUG: Location found in extracted info: '{info.location}'")
-                lat, lng = self.geocode_location(info.location)
-                info.latitude = lat
-                info.longitude = lng
-                print(f"DEBUG: After geocoding - lat={info.latitude}, lon={info.longitude}")
-            else:
-                print(f"DEBUG: No location found in extracted info")
+        # Coordinates are only needed once a case will be created, so intermediate
+        # turns skip the Google Maps round-trip
+        if info.latitude is not None:
+            logger.debug("extract_info_reused_coordinates location=%r", info.location)
+        elif self.should_create_case(info):
+            lat, lng = await asyncio.to_thread(self.geocode_location, info.location)
+            info.latitude = lat
+            info.longitude = lng
+            # Kept on the cached extraction so later turns with the same location can reuse them
+            data["latitude"] = lat
+            data["longitude"] = lng
+            logger.debug(
+                "extract_info_geocoded location=%r lat=%s lng=%s", info.location, lat, lng
+            )
+        else:
+            logger.debug("extract_info_geocode_deferred reason=case_details_incomplete")
 
-            return info
-        except Exception as e:
-            # If parsing fails, log the error and return empty info
-            print(f"ERROR extracting emergency info: {e}")
-            import traceback
-            print(f"Traceback: {traceback.format_exc()}")
-            return EmergencyInfo()
+        return info
 
-    def analyse_emergency(self, info: EmergencyInfo) -> EmergencyInfo:
+    @staticmethod
+    def _flatten_content(content) -> str:
+        """Gemini returns either a plain string or a list of content blocks; reduce both to text"""
+        if isinstance(content, str):
+            return content
+        if isinstance(content, list):
+            # A list comprehension lets join size the result in one pass; a generator
+            # would be materialized into a list by join anyway
+            return "".join([_block_text(block) for block in content])
+        return str(content)
+
+    async def analyse_emergency(self, info: EmergencyInfo) -> EmergencyInfo:
         """Use LLM to populate analysis fields on the emergency info."""
         prompt = f"""Given this emergency, return a JSON object with these fields:
 - "p2p": boolean — true if a non-specialist peer could help (e.g. giving food/water, basic first aid, shelter), false if specialist assistance is needed (e.g. advanced medical, heavy rescue)
@@ -222,32 +436,25 @@ Emergency details:
 Return ONLY valid JSON, no markdown."""
 
         try:
-            response = self.llm.invoke([
-                SystemMessage(content="You are a triage analyst. Return only valid JSON."),
+            response = await _ainvoke_limited(self.llm, [
+                self.triage_system_message,
                 HumanMessage(content=prompt),
             ])
-            content = response.content
-            if isinstance(content, list):
-                content = "".join(
-                    block.get("text", "") if isinstance(block, dict) else str(block)
-                    for block in content
-                ).strip()
-            else:
-                content = str(content).strip()
+            content = self._flatten_content(response.content).strip()
             if content.startswith("```json"):
                 content = content[7:]
             if content.startswith("```"):
                 content = content[3:]
             if content.endswith("```"):
                 content = content[:-3]
-            data = json.loads(content.strip())
+            data = orjson.loads(content.strip())
             info.p2p = bool(data.get("p2p", False))
             info.confidence = int(data["confidence"]) if data.get("confidence") is not None else None
             info.required_capability = data.get("required_capability")
             info.parsed_need_type = data.get("parsed_need_type")
             info.recommended_action = data.get("recommended_action")
         except Exception as e:
-            print(f"WARNING: analyse_emergency LLM call failed: {e}")
+            logger.warning("analyse_emergency_failed error=%s", e)
         return info
 
     def should_create_case(self, info: EmergencyInfo) -> bool:
@@ -261,52 +468,63 @@ Return ONLY valid JSON, no markdown."""
             ]
         )
 
-    def create_case(self, info: EmergencyInfo, user_id: str, conn) -> str:
-        """Create an emergency case in the database"""
-        with conn.cursor() as cur:
-            case_id = str(uuid.uuid4())
-            now = datetime.utcnow()
-
-            # First, ensure user exists (create if not)
-            cur.execute('SELECT id FROM "user" WHERE id = %s', (user_id,))
-            if not cur.fetchone():
-                # Create user with info we have including coordinates
-                cur.execute(
-                    """
-                    INSERT INTO "user" (id, name, phone, role, status, location, latitude, longitude)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (id) DO NOTHING
-                    """,
-                    (
-                        user_id,
-                        info.full_name or "Unknown",
-                        info.social_security_number or "Unknown",
-                        "Victim",
-                        "Active",
-                        info.location,
-                        info.latitude,
-                        info.longitude,
-                    ),
-                )
+    def create_case(self, info: EmergencyInfo, user_id: Optional[str], conn) -> str:
+        """Create an emergency case in the database; user_id None creates a new user"""
 
-            # Determine category and severity
-            category = info.category or "other"
-            severity = info.severity or 3
-            title = f"{category.replace('_', ' ').title()} Emergency"
+        # Determine category and severity
+        category = info.category or "other"
+        severity = info.severity or 3
+        title = f"{category.replace('_', ' ').title()} Emergency"
+        event_description = f"{info.emergency_description} {info.location}"
 
-            # Create the case
+        # User upsert, case, initial event and initial message in one statement: a single
+        # round-trip to Postgres instead of one per insert. Foreign keys are checked at the end
+        # of the statement, so the message can reference the user upserted alongside it.
+        # Timestamps come from the column defaults (now()), so every row shares the transaction time.
+        # Ids come from their gen_random_uuid() defaults; the case id is read back from RETURNING.
+        with conn.cursor() as cur:
             cur.execute(
                 """
-                INSERT INTO "case" (id, title, summary, severity, status, category, stress_level,
-                    p2p, confidence, required_capability, parsed_need_type, recommended_action,
-                    created_at, updated_at)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                RETURNING id
+                WITH upsert_user AS (
+                    -- An existing user gets the latest location
+                    INSERT INTO "user" (id, name, phone, role, status, location, latitude, longitude)
+                    VALUES (COALESCE(%s::uuid, gen_random_uuid()), %s, %s, %s, %s, %s, %s, %s)
+                    ON CONFLICT (id) DO UPDATE
+                    SET location = EXCLUDED.location,
+                        latitude = EXCLUDED.latitude,
+                        longitude = EXCLUDED.longitude
+                    RETURNING id
+                ),
+                new_case AS (
+                    INSERT INTO "case" (title, summary, severity, status, category, stress_level,
+                        p2p, confidence, required_capability, parsed_need_type, recommended_action)
+                    VALUES (%s, LEFT(%s, 200), %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    RETURNING id
+                ),
+                new_event AS (
+                    INSERT INTO event (case_id, description, latitude, longitude)
+                    SELECT id, %s, %s, %s FROM new_case
+                ),
+                -- Store initial message with coordinates
+                new_message AS (
+                    INSERT INTO text_message (source, target, raw_text, user_id, latitude, longitude)
+                    SELECT %s, %s, %s, id, %s, %s FROM upsert_user
+                )
+                SELECT id::text AS id FROM new_case
                 """,
                 (
-                    case_id,
+                    # upsert_user
+                    user_id,
+                    info.full_name or "Unknown",
+                    info.social_security_number or "Unknown",
+                    "Victim",
+                    "Active",
+                    info.location,
+                    info.latitude,
+                    info.longitude,
+                    # new_case
                     title,
-                    info.emergency_description[:200],
+                    info.emergency_description,
                     severity,
                     "Open",
                     category,
@@ -316,172 +534,167 @@ Return ONLY valid JSON, no markdown."""
                     info.required_capability,
                     info.parsed_need_type,
                     info.recommended_action,
-                    now,
-                    now,
-                ),
-            )
-
-            # Create initial event
-            event_id = str(uuid.uuid4())
-            coords_text = (
-                f"\nCoordinates: {info.latitude:.6f}, {info.longitude:.6f}"
-                if info.latitude and info.longitude
-                else ""
-            )
-            event_description = f"{info.emergency_description} {info.location}"
-
-            cur.execute(
-                """
-                INSERT INTO event (id, case_id, timestamp, description, latitude, longitude)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                """,
-                (
-                    event_id,
-                    case_id,
-                    now,
+                    # new_event
                     event_description,
                     info.latitude,
                     info.longitude,
-                ),
-            )
-
-            # Store initial message with coordinates
-            message_id = str(uuid.uuid4())
-            cur.execute(
-                """
-                INSERT INTO text_message (id, source, target, raw_text, user_id, latitude, longitude, created_at)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                """,
-                (
-                    message_id,
+                    # new_message
                     "SMS",
                     "emergency",
                     event_description,
-                    user_id,
                     info.latitude,
                     info.longitude,
-                    now,
                 ),
             )
+            case_id = cur.fetchone()["id"]
 
-            conn.commit()
-            return case_id
+        conn.commit()
+        invalidate_reads()
+        return case_id
 
-    def process_message(
-        self, message: str, conversation_history: List[Dict], user_id: str, db_url: str
-    ) -> Tuple[str, Optional[str], Optional[EmergencyInfo]]:
-        """Process a message and return response, case_id if created, and extracted info"""
-        # Build message history for the LLM
-        messages = [SystemMessage(content=self.system_prompt)]
+    def _create_case_pooled(self, info: EmergencyInfo, user_id: Optional[str]) -> str:
+        """create_case on a connection borrowed from the shared pool"""
+        with get_pool().connection() as conn:
+            return self.create_case(info, user_id, conn)
 
+    def _build_reply_messages(self, message: str, conversation_history: List[Dict]) -> List:
+        """System prompt, prior turns and the new user message as LangChain messages"""
+        history = []
         for msg in conversation_history:
             if msg["role"] == "user":
-                messages.append(HumanMessage(content=msg["content"]))
+                history.append(HumanMessage(content=msg["content"]))
             elif msg["role"] == "assistant":
-                messages.append(AIMessage(content=msg["content"]))
-
-        # Add the new message
-        messages.append(HumanMessage(content=message))
-
-        # Get response from LLM
-        response = self.llm.invoke(messages)
-        # Handle both string and list response formats from Gemini
-        if isinstance(response.content, list):
-            # Extract text from content blocks
-            response_text = "".join(
-                block.get("text", "") if isinstance(block, dict) else str(block)
-                for block in response.content
-            )
-        else:
-            response_text = str(response.content)
-
-        # Extract information from the conversation
-        full_conversation = conversation_history + [
-            {"role": "user", "content": message},
-            {"role": "assistant", "content": response_text},
-        ]
+                history.append(AIMessage(content=msg["content"]))
 
-        info = self.extract_info_from_conversation(full_conversation)
+        return self.reply_prompt.format_messages(history=history, message=message)
 
-        # Check if we should create a case
+    async def _create_case_and_alert(
+        self, info: EmergencyInfo, user_id: Optional[str], db_url: str
+    ) -> Tuple[str, Optional[str]]:
+        """Create a case if enough info was extracted; return text to append to the reply and the case_id"""
+        response_text = ""
         case_id = None
-        responder_notification = None
         if self.should_create_case(info):
-            info = self.analyse_emergency(info)
+            info = await self.analyse_emergency(info)
             try:
-                with psycopg.connect(db_url, row_factory=dict_row) as conn:
-                    case_id = self.create_case(info, user_id, conn)
-
-                    # Add confirmation to response
-                    response_text += (
-                        f"\n\n✅ Emergency case created! Case ID: {case_id[:8]}...\n"
-                    )
-                    response_text += (
-                        f"Category: {info.category}, Severity: {info.severity}/5\n"
-                    )
-                    if info.latitude and info.longitude:
-                        response_text += f"📍 Location coordinates: {info.latitude:.6f}, {info.longitude:.6f}\n"
-
-                    # Alert nearby responders for high-severity emergencies
-                    print(f"DEBUG: Checking if should alert responders - severity={info.severity}, lat={info.latitude}, lon={info.longitude}")
-
-                    if (
-                        info.severity
-                        and info.severity >= 3
-                        and info.latitude
-                        and info.longitude
-                    ):
-                        print(f"DEBUG: Conditions met! Attempting to alert responders...")
-                        try:
-                            from responder_notifier import alert_nearby_help
-
-                            # Convert EmergencyInfo to dict for the notifier
-                            emergency_dict = {
-                                "emergency_description": info.emergency_description,
-                                "location": info.location,
-                                "latitude": info.latitude,
-                                "longitude": info.longitude,
-                                "category": info.category,
-                                "severity": info.severity,
-                            }
-
-                            print(f"DEBUG: Emergency info - category={info.category}, desc={info.emergency_description[:50] if info.emergency_description else 'None'}")
-
-                            # DEMO MODE: Use very large radius
-                            radius_km = 500.0  # 500km to cover all of Northern Sweden for demo
-                            print(f"DEBUG: DEMO MODE - Searching for responders within {radius_km}km...")
-
-                            # Alert responders
-                            notification_result = alert_nearby_help(
-                                db_url,
-                                emergency_dict,
-                                case_id,
-                                radius_km=radius_km,
-                                max_responders=10,  # Allow more responders for demo
-                            )
-
-                            print(f"DEBUG: Notification result: {notification_result}")
-
-                            if notification_result["notifications_sent"] > 0:
-                                response_text += f"\n🚨 {notification_result['notifications_sent']} nearby responders have been alerted!"
-                                responder_notification = notification_result
-                            elif notification_result["responders_found"] > 0:
-                                response_text += f"\n⚠️ Found {notification_result['responders_found']} responders but couldn't send SMS (check Twilio/phone numbers)"
-                            else:
-                                response_text += f"\n⚠️ No responders found within {radius_km}km. Expand search area or add more responders."
-
-                        except Exception as e:
-                            import traceback
-                            print(f"ERROR alerting responders: {e}")
-                            print(f"Full traceback: {traceback.format_exc()}")
-                            response_text += f"\n⚠️ Error alerting responders (check logs)"
-                            # Don't fail the whole process if responder notification fails
-                    else:
-                        print(f"DEBUG: Not alerting responders - conditions not met")
-
-                    response_text += "\nHelp is being coordinated. Stay calm and safe."
-            except Exception as e:
-                print(f"Error creating case: {e}")
+                # psycopg is synchronous: run the insert on a worker thread so the event loop keeps serving
+                case_id = await asyncio.to_thread(self._create_case_pooled, info, user_id)
+            except Exception:
+                logger.exception("create_case_failed user_id=%s", user_id)
                 response_text += "\n\n⚠️ There was an issue creating your emergency case. Please try again."
+                return response_text, case_id
+
+            # Add confirmation to response
+            response_text += (
+                f"\n\n✅ Emergency case created! Case ID: {case_id[:8]}...\n"
+            )
+            response_text += (
+                f"Category: {info.category}, Severity: {info.severity}/5\n"
+            )
+            if info.latitude and info.longitude:
+                response_text += f"📍 Location coordinates: {info.latitude:.6f}, {info.longitude:.6f}\n"
+
+            # Alert nearby responders for high-severity emergencies
+            if (
+                info.severity
+                and info.severity >= 3
+                and info.latitude
+                and info.longitude
+            ):
+                # Convert EmergencyInfo to dict for the notifier
+                emergency_dict = {
+                    "emergency_description": info.emergency_description,
+                    "location": info.location,
+                    "latitude": info.latitude,
+                    "longitude": info.longitude,
+                    "category": info.category,
+                    "severity": info.severity,
+                }
+                _schedule_responder_alert(db_url, emergency_dict, case_id)
+                response_text += "\n🚨 Nearby responders are being alerted now."
+            else:
+                logger.debug(
+                    "responder_alert_skipped case_id=%s severity=%s lat=%s lng=%s",
+                    case_id, info.severity, info.latitude, info.longitude,
+                )
+
+            response_text += "\nHelp is being coordinated. Stay calm and safe."
 
-        return response_text, case_id, info
+        return response_text, case_id
+
+    async def _extract_if_plausible(self, user_conversation: List[Dict]) -> EmergencyInfo:
+        """Run extraction only on turns where the user may have given an ID (see extraction_gate)."""
+        if not should_extract(user_conversation):
+            return EmergencyInfo()
+        return await self.extract_info_from_conversation(user_conversation)
+
+    async def _extract_for_turn(self, user_conversation: List[Dict]) -> EmergencyInfo:
+        """
+        Extraction for a turn running alongside the reply. Only the reply may fail the turn: an
+        extraction error or timeout is logged and the turn goes on without extracted info.
+        """
+        try:
+            async with asyncio.timeout(LLM_TURN_TIMEOUT_SECONDS):
+                return await self._extract_if_plausible(user_conversation)
+        except TimeoutError:
+            logger.warning("extract_info_timeout seconds=%s", LLM_TURN_TIMEOUT_SECONDS)
+        except Exception:
+            logger.exception("extract_info_error")
+        return EmergencyInfo()
+
+    async def _reply(self, messages: List) -> AIMessage:
+        # A hung call raises TimeoutError rather than stalling the webhook
+        async with asyncio.timeout(LLM_TURN_TIMEOUT_SECONDS):
+            return await _ainvoke_limited(self.llm, messages)
+
+    async def process_message(
+        self, message: str, conversation_history: List[Dict], user_id: Optional[str], db_url: str
+    ) -> Tuple[str, Optional[str], Optional[EmergencyInfo]]:
+        """Process a message and return response, case_id if created, and extracted info"""
+        messages = self._build_reply_messages(message, conversation_history)
+
+        # Extraction only needs what the user has said so far, so it runs
+        # alongside the reply instead of waiting for it.
+        user_conversation = conversation_history + [{"role": "user", "content": message}]
+
+        # Each leg has its own timeout; only the reply's errors reach the caller
+        response, info = await asyncio.gather(
+            self._reply(messages),
+            self._extract_for_turn(user_conversation),
+        )
+        response_text = self._flatten_content(response.content)
+
+        case_text, case_id = await self._create_case_and_alert(info, user_id, db_url)
+        return response_text + case_text, case_id, info
+
+    async def stream_message(
+        self, message: str, conversation_history: List[Dict], user_id: Optional[str], db_url: str
+    ) -> AsyncIterator[Dict]:
+        """
+        Like process_message, but streams the reply as Gemini generates it.
+        Yields {"type": "delta", "text": ...} events, then one final
+        {"type": "done", "text": <case confirmation or "">, "case_id": ..., "extracted_info": ...}.
+        """
+        messages = self._build_reply_messages(message, conversation_history)
+        user_conversation = conversation_history + [{"role": "user", "content": message}]
+        extract_task = asyncio.create_task(self._extract_for_turn(user_conversation))
+        try:
+            # The slot is held for the whole stream: it is one in-flight Gemini request
+            async with _llm_semaphore:
+                async for chunk in self.llm.astream(messages):
+                    text = self._flatten_content(chunk.content)
+                    if text:
+                        yield {"type": "delta", "text": text}
+            info = await extract_task
+        finally:
+            # Client went away mid-stream: don't leave the extraction call running
+            if not extract_task.done():
+                extract_task.cancel()
+
+        case_text, case_id = await self._create_case_and_alert(info, user_id, db_url)
+        yield {
+            "type": "done",
+            "text": case_text,
+            "case_id": case_id,
+            "extracted_info": info.model_dump() if info else None,
+        }
@@ -1,9 +1,121 @@
 """Database persistence helpers."""
 
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Tuple
+
 import psycopg
+from pgvector.psycopg import register_vector
+from psycopg.conninfo import conninfo_to_dict
+from psycopg.rows import dict_row
+from psycopg.types.string import TextLoader
+from psycopg_pool import ConnectionPool
 
 from env import SUPABASE_POSTGRES_URL
 
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+# Port of Supabase's transaction-mode pooler (Supavisor); session mode and direct connections use 5432
+_TRANSACTION_POOLER_PORT = "6543"
+
+
+def _prepare_threshold(conninfo: str) -> int | None:
+    """
+    Server-side prepare the hot INSERTs from their second execution, except behind the
+    transaction pooler: it does not keep prepared statements per client and raises
+    DuplicatePreparedStatement, so preparation stays off there.
+    """
+    if conninfo_to_dict(conninfo).get("port") == _TRANSACTION_POOLER_PORT:
+        return None
+    return 1
+
+
+# prepare= value for hot statements (SMS webhook, dashboard reads): server-side prepared on their first execution
+# instead of their second. None (psycopg's default, i.e. never, per the threshold) behind the pooler.
+PREPARE_HOT: bool | None = (
+    True if _prepare_threshold(SUPABASE_POSTGRES_URL) is not None else None
+)
+
+
+def _configure(conn: psycopg.Connection) -> None:
+    """
+    uuid columns load as their canonical text (str), decoded by the C text loader: every caller
+    returns ids as strings, so building uuid.UUID objects only to str() them again is skipped.
+    NumPy arrays dump as pgvector's binary vector (float32 on the wire, no float/text round-trip).
+    """
+    conn.adapters.register_loader("uuid", TextLoader)
+    register_vector(conn)
+
+
+def get_pool() -> ConnectionPool:
+    """Shared connection pool (dict rows, uuids as str, binary vectors), opened on first use so importing the app never connects."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    SUPABASE_POSTGRES_URL,
+                    min_size=5,
+                    max_size=20,
+                    # Connections idle in the pool can be dropped by Supabase; verify one before handing it out
+                    check=ConnectionPool.check_connection,
+                    configure=_configure,
+                    kwargs={
+                        "row_factory": dict_row,
+                        "prepare_threshold": _prepare_threshold(SUPABASE_POSTGRES_URL),
+                    },
+                )
+    return _pool
+
+
+def close_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+# Dashboards poll the responder case list and the live events every few seconds. Their results are
+# reused for this many seconds, so one query serves every poll in the window. Every write that
+# changes cases or events (API endpoints, agent.create_case, responder SMS replies, persist_event)
+# calls invalidate_reads() after committing.
+_READ_CACHE_TTL = 1.5
+_read_cache: Dict[Tuple, Tuple[float, Any]] = {}
+_read_cache_generation = 0
+# One lock per key: concurrent misses wait for a single query instead of all hitting the database
+_read_cache_locks: Dict[Tuple, threading.Lock] = {}
+_read_cache_locks_guard = threading.Lock()
+
+
+def cached_read(key: Tuple, load: Callable[[], Any]) -> Any:
+    """load()'s result, reused for _READ_CACHE_TTL seconds. Blocking; failures are not cached."""
+    hit = _read_cache.get(key)
+    if hit is not None and hit[0] > time.monotonic():
+        return hit[1]
+    with _read_cache_locks_guard:
+        lock = _read_cache_locks.setdefault(key, threading.Lock())
+    with lock:
+        # Another request may have loaded it while this one waited for the lock
+        hit = _read_cache.get(key)
+        if hit is not None and hit[0] > time.monotonic():
+            return hit[1]
+        generation = _read_cache_generation
+        value = load()
+        # Not stored if a write invalidated the cache while the query ran
+        if generation == _read_cache_generation:
+            _read_cache[key] = (time.monotonic() + _READ_CACHE_TTL, value)
+        return value
+
+
+def invalidate_reads() -> None:
+    """Drop cached reads after a write that changes cases or events."""
+    global _read_cache_generation
+    _read_cache_generation += 1
+    _read_cache.clear()
+
 
 def persist_text_message(
     *,
@@ -12,8 +124,9 @@ def persist_text_message(
     direction: str,
     provider_message_sid: str | None = None,
     delivery_status: str | None = None,
-) -> str:
-    with psycopg.connect(SUPABASE_POSTGRES_URL) as conn:
+) -> tuple[str, datetime]:
+    """Insert one SMS row; returns its id and created_at (callers page history from that timestamp)."""
+    with get_pool().connection() as conn:
         with conn.cursor() as cur:
             try:
                 cur.execute(
@@ -21,22 +134,23 @@ def persist_text_message(
                     INSERT INTO text_message (
                         source, target, raw_text, direction, provider_message_sid, delivery_status
                     ) VALUES (%s, %s, %s, %s, %s, %s)
-                    RETURNING id
+                    RETURNING id, created_at
                     """,
                     ("SMS", target, raw_text, direction, provider_message_sid, delivery_status),
+                    prepare=PREPARE_HOT,
                 )
-                inserted_id = cur.fetchone()[0]
+                row = cur.fetchone()
             except psycopg.errors.UndefinedColumn:
                 cur.execute(
                     """
                     INSERT INTO text_message (source, target, raw_text)
                     VALUES (%s, %s, %s)
-                    RETURNING id
+                    RETURNING id, created_at
                     """,
                     ("SMS", target, raw_text),
                 )
-                inserted_id = cur.fetchone()[0]
-    return str(inserted_id)
+                row = cur.fetchone()
+    return str(row["id"]), row["created_at"]
 
 
 def persist_event(
@@ -45,7 +159,7 @@ def persist_event(
     description: str,
     text_message_id: str | None = None,
 ) -> None:
-    with psycopg.connect(SUPABASE_POSTGRES_URL) as conn:
+    with get_pool().connection() as conn:
         with conn.cursor() as cur:
             try:
                 cur.execute(
@@ -54,6 +168,7 @@ def persist_event(
                     VALUES (%s, %s, %s)
                     """,
                     (case_id, description, text_message_id),
+                    prepare=PREPARE_HOT,
                 )
             except psycopg.errors.UndefinedColumn:
                 cur.execute(
@@ -63,3 +178,4 @@ def persist_event(
                     """,
                     (case_id, description),
                 )
+    invalidate_reads()
@@ -1,9 +1,22 @@
-"""ElevenLabs text-to-speech: call the voice generation API and return μ-law 8kHz audio for Twilio."""
+"""ElevenLabs text-to-speech: call the voice generation API and stream μ-law 8kHz audio for Twilio."""
 
+import asyncio
+import hashlib
 import logging
-from typing import Optional
+from collections import OrderedDict
+from contextlib import aclosing
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
 
-import env
+import httpx
+import orjson
+
+from env import (
+    ELEVEN_LABS_API_KEY,
+    ELEVEN_LABS_MODEL_ID,
+    ELEVEN_LABS_TTS_CACHE_DIR,
+    ELEVEN_LABS_VOICE_ID,
+)
 
 logger = logging.getLogger("uvicorn.error")
 
@@ -13,51 +26,244 @@ _DEFAULT_MODEL_ID = "eleven_multilingual_v2"
 DEFAULT_VOICE_ID = "21m00Tcm4TlvDq8ikWAM"
 # Twilio expects μ-law 8kHz; ElevenLabs can return it directly
 OUTPUT_FORMAT = "ulaw_8000"
-ELEVEN_TTS_URL_TEMPLATE = "https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
+# The /stream variant sends audio as it is generated, so playback can start before synthesis ends
+ELEVEN_TTS_URL_TEMPLATE = "https://api.elevenlabs.io/v1/text-to-speech/{voice_id}/stream"
+# Chunks are handed to the caller as 20ms Twilio media frames (160 bytes of μ-law 8kHz)
+FRAME_BYTES = 160
+# Trades a little voice quality for earlier first audio (ElevenLabs accepts 0-4)
+OPTIMIZE_STREAMING_LATENCY = 3
+
+# Settings are fixed for the life of the process, so they are resolved once here, not per utterance
+_API_KEY = ELEVEN_LABS_API_KEY or ""
+_VOICE_ID = ELEVEN_LABS_VOICE_ID or DEFAULT_VOICE_ID
+_MODEL_ID = ELEVEN_LABS_MODEL_ID or _DEFAULT_MODEL_ID
+_HEADERS = {
+    "Accept": "audio/*",
+    "Content-Type": "application/json",
+    "xi-api-key": _API_KEY,
+}
+# Full request URL per voice id, query string included
+_URL_CACHE: Dict[str, str] = {}
+
+# One pooled async client for the process: successive utterances reuse the keep-alive TLS
+# connection to api.elevenlabs.io, and concurrent calls don't tie up worker threads.
+# Transport retries cover connect errors. Closed by the app's lifespan via aclose().
+_HTTP = httpx.AsyncClient(
+    timeout=httpx.Timeout(30.0, connect=5.0),
+    limits=httpx.Limits(max_connections=64, max_keepalive_connections=16),
+    transport=httpx.AsyncHTTPTransport(retries=2),
+)
+
+# Synthesized phrases kept in memory; μ-law 8kHz is ~8KB per second of speech, so this stays small
+TTS_CACHE_SIZE = 256
+_tts_cache: "OrderedDict[Tuple[str, str, str], bytes]" = OrderedDict()
+# Optional: directory for a second cache tier that survives restarts (one .ulaw file per phrase)
+_TTS_CACHE_DIR = ELEVEN_LABS_TTS_CACHE_DIR
+
+_stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "coalesced": 0}
+
+# Phrases being synthesized right now, so concurrent calls for the same phrase (e.g. one prompt on
+# several calls at once) wait for a single upstream request. Resolves to the audio, or None on failure.
+# Only touched from the event loop between awaits, so no lock is needed.
+_inflight: "Dict[Tuple[str, str, str], asyncio.Future]" = {}
+
+
+def _disk_cache_path(key: Tuple[str, str, str]) -> Optional[Path]:
+    if not _TTS_CACHE_DIR:
+        return None
+    text, vid, model_id = key
+    digest = hashlib.blake2b(
+        f"{vid}|{model_id}|{OUTPUT_FORMAT}|{text}".encode("utf-8"), digest_size=16
+    ).hexdigest()
+    return Path(_TTS_CACHE_DIR) / f"{digest}.ulaw"
+
+
+def _read_disk_cache(path: Path) -> Optional[bytes]:
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+def _write_disk_cache(path: Path, audio: bytes) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(audio)
+    except OSError as e:
+        logger.warning("elevenlabs_tts_cache_write_failed path=%s error=%s", path, e)
+
+
+# One 20ms frame: bytes off the wire, or a zero-copy view into cached audio
+Frame = Union[bytes, memoryview]
 
+# Longest error body kept for the log line
+_ERROR_BODY_BYTES = 500
 
-def text_to_speech(text: str, voice_id: Optional[str] = None) -> Optional[bytes]:
+
+def _frames(audio: bytes) -> List[Frame]:
+    """FRAME_BYTES views over cached audio; slicing a memoryview copies nothing"""
+    view = memoryview(audio)
+    return [view[i : i + FRAME_BYTES] for i in range(0, len(audio), FRAME_BYTES)]
+
+
+def _cache_audio(key: Tuple[str, str, str], audio: bytes) -> None:
+    _tts_cache[key] = audio
+    _tts_cache.move_to_end(key)
+    if len(_tts_cache) > TTS_CACHE_SIZE:
+        _tts_cache.popitem(last=False)
+
+
+def cache_stats() -> Dict[str, Optional[int]]:
+    """Hit/miss counters for the TTS cache tiers."""
+    return {
+        "memory_hits": _stats["memory_hits"],
+        "memory_misses": _stats["misses"] + _stats["disk_hits"],
+        "memory_size": len(_tts_cache),
+        "memory_max_size": TTS_CACHE_SIZE,
+        "disk_hits": _stats["disk_hits"] if _TTS_CACHE_DIR else None,
+        "coalesced": _stats["coalesced"],
+    }
+
+
+# Fixed phrases the voice flow speaks verbatim, keyed by prompt id. warm_prompts() synthesizes them
+# at startup so prompt_audio() replays ready-made frames with no encoding or network call.
+PROMPTS: Dict[str, str] = {
+    "agent_error": "I'm sorry, I had a small problem. Please try again.",
+}
+_prebaked: Dict[str, List[Frame]] = {}
+
+
+async def warm_prompts() -> int:
+    """Synthesize every entry in PROMPTS once; returns how many are ready."""
+    for prompt_id, text in PROMPTS.items():
+        audio = b"".join([frame async for frame in text_to_speech(text)])
+        if audio:
+            _prebaked[prompt_id] = _frames(audio)
+    logger.info("elevenlabs_prompts_warmed ready=%s total=%s", len(_prebaked), len(PROMPTS))
+    return len(_prebaked)
+
+
+async def prompt_audio(prompt_id: str) -> AsyncIterator[Frame]:
+    """Frames for a PROMPTS entry: prebaked if warm, otherwise synthesized like any other text."""
+    frames = _prebaked.get(prompt_id)
+    if frames is None:
+        async for frame in text_to_speech(PROMPTS[prompt_id]):
+            yield frame
+        return
+    for frame in frames:
+        yield frame
+
+
+async def aclose() -> None:
+    """Close the pooled HTTP client (app shutdown)."""
+    await _HTTP.aclose()
+
+
+async def text_to_speech(text: str, voice_id: Optional[str] = None) -> AsyncIterator[Frame]:
     """
     Generate speech from text using ElevenLabs API.
-    Returns raw μ-law 8kHz audio bytes suitable for Twilio Media Stream, or None on error.
+    Yields raw μ-law 8kHz audio in FRAME_BYTES frames for Twilio Media Stream as they arrive;
+    yields nothing on error. Repeated phrases (greetings, prompts) are served from cache
+    without calling the API.
     """
-    if not text or not text.strip():
-        return None
-    api_key = getattr(env, "ELEVEN_LABS_API_KEY", None) or ""
-    if not api_key:
+    text = text.strip() if text else ""
+    if not text:
+        return
+    if not _API_KEY:
         logger.warning("elevenlabs_skip ELEVEN_LABS_API_KEY not set")
-        return None
-    vid = voice_id or getattr(env, "ELEVEN_LABS_VOICE_ID", None) or DEFAULT_VOICE_ID
-    model_id = getattr(env, "ELEVEN_LABS_MODEL_ID", None) or _DEFAULT_MODEL_ID
-    url = ELEVEN_TTS_URL_TEMPLATE.format(voice_id=vid)
-    url = f"{url}?output_format={OUTPUT_FORMAT}"
-    headers = {
-        "Accept": "audio/*",
-        "Content-Type": "application/json",
-        "xi-api-key": api_key,
-    }
-    payload = {"text": text.strip(), "model_id": model_id}
+        return
+    vid = voice_id or _VOICE_ID
+    key = (text, vid, _MODEL_ID)
+
+    audio = _tts_cache.get(key)
+    if audio is not None:
+        _tts_cache.move_to_end(key)
+        _stats["memory_hits"] += 1
+        for frame in _frames(audio):
+            yield frame
+        return
+    inflight = _inflight.get(key)
+    if inflight is not None:
+        _stats["coalesced"] += 1
+        audio = await asyncio.shield(inflight)
+        if audio:
+            for frame in _frames(audio):
+                yield frame
+            return
+        # The leading caller failed or stopped early (e.g. hung up): fetch it for this caller
+        # rather than play silence
+        async with aclosing(_fetch(key)) as frames:
+            async for frame in frames:
+                yield frame
+        return
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    audio = None
     try:
-        import json as _json
-        import urllib.error
-        import urllib.request
-
-        req = urllib.request.Request(
-            url,
-            data=_json.dumps(payload).encode("utf-8"),
-            headers=headers,
-            method="POST",
-        )
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            return resp.read()
-    except urllib.error.HTTPError as e:
-        body = e.fp.read().decode("utf-8", errors="replace") if e.fp else ""
-        logger.error(
-            "elevenlabs_tts_error status=%s body=%s",
-            e.code,
-            body[:500] if body else "(none)",
+        # aclosing: if the caller stops early, the upstream HTTP stream is closed right away
+        async with aclosing(_fetch(key)) as frames:
+            async for frame in frames:
+                yield frame
+        audio = _tts_cache.get(key)
+    finally:
+        # Also reached if the leading caller stops early: the waiters then get None (not a hang)
+        # and fetch the phrase themselves
+        del _inflight[key]
+        future.set_result(audio)
+
+
+async def _fetch(key: Tuple[str, str, str]) -> AsyncIterator[Frame]:
+    """Frames for one phrase from the disk tier or ElevenLabs; a complete utterance is cached."""
+    text, vid, model_id = key
+    path = _disk_cache_path(key)
+    if path is not None:
+        audio = await asyncio.to_thread(_read_disk_cache, path)
+        if audio is not None:
+            _stats["disk_hits"] += 1
+            _cache_audio(key, audio)
+            for frame in _frames(audio):
+                yield frame
+            return
+    _stats["misses"] += 1
+
+    url = _URL_CACHE.get(vid)
+    if url is None:
+        url = _URL_CACHE.setdefault(
+            vid,
+            ELEVEN_TTS_URL_TEMPLATE.format(voice_id=vid)
+            + f"?output_format={OUTPUT_FORMAT}&optimize_streaming_latency={OPTIMIZE_STREAMING_LATENCY}",
         )
-        return None
+    # orjson encodes straight to UTF-8 bytes in one pass; httpx's json= would go through stdlib json
+    payload = orjson.dumps({"text": text, "model_id": model_id})
+    chunks = []
+    try:
+        async with _HTTP.stream("POST", url, content=payload, headers=_HEADERS) as resp:
+            if resp.status_code >= 400:
+                # Only the first bytes are read and decoded; the rest of the body is never pulled
+                raw = b""
+                async for part in resp.aiter_bytes():
+                    raw += part
+                    if len(raw) >= _ERROR_BODY_BYTES:
+                        break
+                logger.error(
+                    "elevenlabs_tts_error status=%s body=%s",
+                    resp.status_code,
+                    raw[:_ERROR_BODY_BYTES].decode("utf-8", errors="replace") or "(none)",
+                )
+                return
+            # Each frame goes to the caller as soon as it is read; a slow WebSocket send
+            # therefore slows the upstream read instead of piling audio up here
+            async for frame in resp.aiter_bytes(FRAME_BYTES):
+                chunks.append(frame)
+                yield frame
     except Exception:
         logger.exception("elevenlabs_tts_error")
-        return None
+        return
+
+    # The frames are also kept so the phrase cache can store the complete utterance;
+    # a stream cut short above never gets here
+    audio = b"".join(chunks)
+    _cache_audio(key, audio)
+    if path is not None:
+        await asyncio.to_thread(_write_disk_cache, path, audio)
@@ -4,9 +4,11 @@ from pathlib import Path
 
 from dotenv import load_dotenv
 
-# Repo root is parent of api/
-_root = Path(__file__).resolve().parent.parent
-load_dotenv(_root / ".env")
+# Repo root is parent of api/. Child processes (workers, OpenAPI export) inherit the parsed
+# values through os.environ, so .env is only read by the first process that imports this.
+if not os.environ.get("_ENV_LOADED"):
+    load_dotenv(Path(__file__).resolve().parent.parent / ".env")
+    os.environ["_ENV_LOADED"] = "1"
 
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
 SUPABASE_POSTGRES_URL = os.environ.get("SUPABASE_POSTGRES_URL")
@@ -19,10 +21,17 @@ VOICE_STREAM_WS_URL = os.environ.get("VOICE_STREAM_WS_URL")
 # Optional: Google APIs (Gemini, Maps). CI may run without them (e.g. OpenAPI export).
 GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY")
 GOOGLE_MAPS_API_KEY = os.environ.get("GOOGLE_MAPS_API_KEY")
+# Optional: max concurrent Gemini requests per process (EmergencyAgent); extra calls wait for a slot.
+GEMINI_MAX_CONCURRENCY = int(os.environ.get("GEMINI_MAX_CONCURRENCY", "8"))
 # Optional: OpenAI API key for voice transcription (Whisper).
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
 # Optional: ElevenLabs API key for TTS (voice reply on calls).
 ELEVEN_LABS_API_KEY = os.environ.get("ELEVEN_LABS_API_KEY")
+# Optional: ElevenLabs TTS voice and model (elevenlabs.py falls back to Rachel / eleven_multilingual_v2).
+ELEVEN_LABS_VOICE_ID = os.environ.get("ELEVEN_LABS_VOICE_ID")
+ELEVEN_LABS_MODEL_ID = os.environ.get("ELEVEN_LABS_MODEL_ID")
+# Optional: directory where synthesized TTS audio is cached across restarts (in-memory cache only if unset).
+ELEVEN_LABS_TTS_CACHE_DIR = os.environ.get("ELEVEN_LABS_TTS_CACHE_DIR")
 # Optional: ElevenLabs Conversational Agent ID (for voice agent via ElevenLabs).
 ELEVENLABS_AGENT_ID = os.environ.get("ELEVENLABS_AGENT_ID")
 if GOOGLE_API_KEY is not None:
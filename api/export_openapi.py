@@ -1,9 +1,36 @@
-"""Export OpenAPI schema to openapi.json so the frontend can generate types without running the server."""
-import json
+"""Export OpenAPI schema to openapi.json so the frontend can generate types without running the server.
+
+Importing the app is the slow part, so a hash of the api/ sources is kept next to the output
+(openapi.json.sig) and the export is skipped when nothing has changed. Pass --force to always export.
+"""
+import hashlib
+import sys
 from pathlib import Path
 
+import orjson
+
+here = Path(__file__).parent
+out = here / "openapi.json"
+sig_file = here / "openapi.json.sig"
+
+digest = hashlib.blake2b()
+for path in sorted(here.rglob("*.py")):
+    if any(part.startswith(".") or part in ("venv", "__pycache__") for part in path.relative_to(here).parts):
+        continue
+    digest.update(str(path.relative_to(here)).encode("utf-8"))
+    digest.update(path.read_bytes())
+sig = digest.hexdigest()
+
+if "--force" not in sys.argv and out.exists() and sig_file.exists() and sig_file.read_text() == sig:
+    print(f"{out} is up to date")
+    sys.exit(0)
+
 from index import app
 
-out = Path(__file__).parent / "openapi.json"
-out.write_text(json.dumps(app.openapi(), indent=2))
+# orjson returns the indented UTF-8 bytes in one buffer, which go straight to disk with no str
+# copy or encode pass; written beside the target and swapped in so a failed run leaves no partial file
+tmp = out.with_suffix(".json.tmp")
+tmp.write_bytes(orjson.dumps(app.openapi(), option=orjson.OPT_INDENT_2))
+tmp.replace(out)
+sig_file.write_text(sig)
 print(f"Wrote {out}")
@@ -0,0 +1,30 @@
+"""Decide whether a conversation turn is worth an extraction LLM call."""
+
+import re
+from typing import Dict, List
+
+# Something that may be an ID number: 6+ digits, optionally split by spaces or dashes, possibly
+# inside letters (personnummer YYMMDD-XXXX, US-style XXX-XX-XXXX, passport-style AB1234567)
+_ID_DIGITS_RE = re.compile(r"\d(?:[\s-]?\d){5,}")
+# The user talking about an ID, e.g. before or while spelling it out in words
+_ID_KEYWORD_RE = re.compile(
+    r"\b(?:ssn|social security|personnummer|personal (?:id|number)|id(?:entity)? (?:number|card)"
+    r"|passport|national id)\b",
+    re.IGNORECASE,
+)
+# Without either signal, extraction still runs every this many user turns, so an ID in a form
+# neither pattern knows is picked up within a few messages
+EXTRACT_EVERY_N_USER_TURNS = 3
+
+
+def should_extract(user_conversation: List[Dict]) -> bool:
+    """
+    A case needs a social security number, so turns before the user has plausibly given one are
+    skipped, saving an LLM call each. The check is deliberately loose: a missed ID costs a case.
+    """
+    user_turns = [m["content"] for m in user_conversation if m["role"] == "user"]
+    if not user_turns:
+        return False
+    if any(_ID_DIGITS_RE.search(text) or _ID_KEYWORD_RE.search(text) for text in user_turns):
+        return True
+    return len(user_turns) % EXTRACT_EVERY_N_USER_TURNS == 0
@@ -0,0 +1,143 @@
+"""Google Maps geocoding with an in-process LRU backed by the Postgres geocode_cache table."""
+
+import functools
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Dict, Optional, Tuple
+
+import psycopg
+from geopy.adapters import RequestsAdapter
+from geopy.extra.rate_limiter import RateLimiter
+from geopy.geocoders import GoogleV3
+
+from db import get_pool
+from env import GOOGLE_MAPS_API_KEY
+
+logger = logging.getLogger("uvicorn.error")
+
+# One geocoder for the whole process. RequestsAdapter keeps a pooled requests.Session,
+# so lookups after the first reuse the TLS connection to maps.googleapis.com.
+_geocoder = GoogleV3(
+    api_key=GOOGLE_MAPS_API_KEY,
+    adapter_factory=functools.partial(RequestsAdapter, pool_connections=1, pool_maxsize=10),
+)
+
+# Google's geocoding quota is 50 QPS; space outbound calls so bursts of SMS don't trip 429s.
+# Lookups run in worker threads, so this is geopy's thread-safe sync limiter, not AsyncRateLimiter.
+GEOCODE_MIN_DELAY_SECONDS = 1 / 50
+_rate_limited_geocode = RateLimiter(
+    _geocoder.geocode,
+    min_delay_seconds=GEOCODE_MIN_DELAY_SECONDS,
+    max_retries=2,
+    error_wait_seconds=1.0,
+    swallow_exceptions=False,
+)
+
+# Rows of geocode_cache loaded at startup by warm_cache(), checked before any database read
+_GEOCODE_WARM_LIMIT = 10_000
+_warm: Dict[str, Tuple[float, float]] = {}
+
+# Lookups currently in flight, so concurrent requests for one address share a single API call
+_inflight: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+def _normalize(location_text: str) -> str:
+    return " ".join(location_text.split()).lower()
+
+
+def warm_cache() -> int:
+    """Load the most recently cached geocodes into memory so first lookups after a restart skip Postgres"""
+    try:
+        with get_pool().connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT location_text, latitude, longitude FROM geocode_cache
+                ORDER BY cached_at DESC
+                LIMIT %s
+                """,
+                (_GEOCODE_WARM_LIMIT,),
+            ).fetchall()
+    except psycopg.Error as e:
+        logger.warning("geocode_cache_warm_error error=%s", e)
+        return 0
+    _warm.update((r["location_text"], (r["latitude"], r["longitude"])) for r in rows)
+    logger.info("geocode_cache_warmed entries=%s", len(rows))
+    return len(rows)
+
+
+def _read_cache(key: str) -> Optional[Tuple[float, float]]:
+    try:
+        with get_pool().connection() as conn:
+            row = conn.execute(
+                "SELECT latitude, longitude FROM geocode_cache WHERE location_text = %s",
+                (key,),
+            ).fetchone()
+    except psycopg.Error as e:
+        logger.warning("geocode_cache_read_error location=%s error=%s", key[:80], e)
+        return None
+    return (row["latitude"], row["longitude"]) if row else None
+
+
+def _write_cache(key: str, lat: float, lng: float) -> None:
+    try:
+        with get_pool().connection() as conn:
+            conn.execute(
+                """
+                INSERT INTO geocode_cache (location_text, latitude, longitude)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (location_text) DO NOTHING
+                """,
+                (key, lat, lng),
+            )
+    except psycopg.Error as e:
+        logger.warning("geocode_cache_write_error location=%s error=%s", key[:80], e)
+
+
+class _NoMatch(Exception):
+    """Google has no match for the address. Raised, not returned, so lru_cache does not keep it."""
+
+
+@functools.lru_cache(maxsize=10_000)
+def _geocode_normalized(key: str) -> Tuple[float, float]:
+    """
+    Coordinates for a normalized address. Only hits are cached: a miss (often a typo or a partial
+    address mid-conversation) is looked up again next time.
+    """
+    coords = _warm.get(key) or _read_cache(key)
+    if coords:
+        return coords
+    location = _rate_limited_geocode(key)
+    if not location:
+        raise _NoMatch(key)
+    _write_cache(key, location.latitude, location.longitude)
+    return location.latitude, location.longitude
+
+
+def geocode(location_text: str) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Geocode a location string to (lat, lng), or (None, None) if Google has no match.
+    Geocoder errors (timeouts, service errors) propagate; neither they nor "no match" are cached.
+    Concurrent calls for the same address wait on the first one instead of hitting the API again.
+    """
+    key = _normalize(location_text)
+    with _inflight_lock:
+        future = _inflight.get(key)
+        is_owner = future is None
+        if is_owner:
+            future = _inflight[key] = Future()
+
+    if is_owner:
+        try:
+            future.set_result(_geocode_normalized(key))
+        except _NoMatch:
+            future.set_result(None)
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with _inflight_lock:
+                del _inflight[key]
+
+    coords = future.result()
+    return coords if coords else (None, None)
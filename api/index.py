@@ -3,24 +3,45 @@ HackEurope API: health, SMS/voice webhooks, messages.
 """
 
 import asyncio
+import itertools
 import math
-import json
+import re
 import logging
 import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Any, Dict, List, Literal, Optional, Tuple
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Literal, Optional, Tuple
+from urllib.parse import parse_qsl
 
-import psycopg
-from psycopg.rows import dict_row
+import numpy as np
+import orjson
 from fastapi import FastAPI, Header, HTTPException, Query, Request, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from geopy.exc import GeocoderServiceError, GeocoderTimedOut
 from pydantic import BaseModel, field_validator
 from twilio.base.exceptions import TwilioRestException
 
 from env import OPENAI_API_KEY, SUPABASE_POSTGRES_URL, VOICE_STREAM_WS_URL
 from workflow_bridge import build_inbound_event, handle_inbound_message
-from db import persist_event, persist_text_message
+from db import (
+    PREPARE_HOT,
+    cached_read,
+    close_pool,
+    get_pool,
+    invalidate_reads,
+    persist_event,
+    persist_text_message,
+)
+from geocoding import geocode, warm_cache as warm_geocode_cache
+from openai_client import close_openai_client, get_openai_client
+from queued_logging import start_queued_logging, stop_queued_logging
+from elevenlabs import (
+    aclose as close_tts_client,
+    cache_stats as tts_cache_stats,
+    warm_prompts as warm_tts_prompts,
+)
 from twilio_app import (
     TwilioConfigError,
     build_connect_stream_twiml,
@@ -29,13 +50,38 @@ from twilio_app import (
     handle_realtime_voice_stream,
     handle_voice_media_stream,
     send_sms,
+    truncate_sms_body,
 )
 from agent import EmergencyAgent, EmergencyInfo
 from sms_speciality_handler import handle_sms_speciality_number
 
-app = FastAPI(title="HackEurope API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # uvicorn.error is the app-wide logger; the stderr writes of the handler it propagates to
+    # happen on the listener thread
+    log_owner, log_listener = start_queued_logging(logging.getLogger("uvicorn.error"))
+    app.state.route_table = _route_table(app)
+    # min_size connections start opening in the background, before the first request needs one
+    get_pool()
+    # Fixed voice prompts are synthesized in the background; until ready they are synthesized on demand
+    tts_warm = asyncio.create_task(warm_tts_prompts())
+    await asyncio.to_thread(warm_geocode_cache)
+    yield
+    tts_warm.cancel()
+    await close_tts_client()
+    close_pool()
+    close_openai_client()
+    stop_queued_logging(log_owner, log_listener)
+
+
+# Responses are encoded with orjson rather than the stdlib json module
+app = FastAPI(title="HackEurope API", lifespan=lifespan, default_response_class=ORJSONResponse)
 webhook_logger = logging.getLogger("uvicorn.error")
 
+# One agent for every request: it holds no per-conversation state, only its Gemini clients and prompts
+_emergency_agent = EmergencyAgent(SUPABASE_POSTGRES_URL)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -152,6 +198,10 @@ class EmergencyRequest(BaseModel):
     longitude: Optional[float] = None
 
 
+# Tuple, not set: membership must not hash arbitrary (possibly unhashable) request values
+_STRESS_LEVELS = ("Low", "Medium", "High")
+
+
 class QuickEmergencyRequest(BaseModel):
     full_name: str
     social_security_number: str
@@ -161,10 +211,10 @@ class QuickEmergencyRequest(BaseModel):
     severity: int = 3
     stress_level: Optional[Literal["Low", "Medium", "High"]] = None
 
-    @field_validator("severity", mode="before")
+    @field_validator("severity", mode="after")
     @classmethod
-    def coerce_severity(cls, v: object) -> int:
-        v = int(v)
+    def check_severity(cls, v: int) -> int:
+        # pydantic has already parsed the int; only the range is checked here
         if v < 1 or v > 5:
             raise ValueError("severity must be between 1 and 5")
         return v
@@ -172,10 +222,10 @@ class QuickEmergencyRequest(BaseModel):
     @field_validator("stress_level", mode="before")
     @classmethod
     def normalize_stress_level(cls, v: object) -> str | None:
-        if v is None:
-            return None
+        if v is None or v in _STRESS_LEVELS:
+            return v
         s = str(v).strip().capitalize()
-        if s not in ("Low", "Medium", "High"):
+        if s not in _STRESS_LEVELS:
             return None
         return s
 
@@ -297,28 +347,37 @@ EMERGENCY_PATTERNS = {
 }
 
 
+def _keyword_regex(keywords: List[str]) -> "re.Pattern[str]":
+    """One alternation over keywords: a single C-level substring scan instead of one `in` per keyword"""
+    return re.compile("|".join(map(re.escape, keywords)))
+
+
+# Compiled once at import; dict order is kept so the first matching category still wins
+_CATEGORY_REGEXES = [(cat, _keyword_regex(kws)) for cat, kws in EMERGENCY_PATTERNS.items()]
+_SEVERITY_REGEXES = [
+    (5, _keyword_regex(["urgent", "critical", "dying", "immediate", "emergency"])),
+    (4, _keyword_regex(["help", "please", "need", "quickly"])),
+    (2, _keyword_regex(["minor", "small", "little"])),
+]
+
+
 def categorize_emergency(text: str) -> Tuple[str, int]:
     """Categorize emergency message and determine severity."""
     text_lower = text.lower()
 
     # Check for category keywords
     category = "other"
-    for cat, keywords in EMERGENCY_PATTERNS.items():
-        if any(kw in text_lower for kw in keywords):
+    for cat, regex in _CATEGORY_REGEXES:
+        if regex.search(text_lower):
             category = cat
             break
 
     # Estimate severity (1-5 scale)
     severity = 3  # default medium
-    if any(
-        word in text_lower
-        for word in ["urgent", "critical", "dying", "immediate", "emergency"]
-    ):
-        severity = 5
-    elif any(word in text_lower for word in ["help", "please", "need", "quickly"]):
-        severity = 4
-    elif any(word in text_lower for word in ["minor", "small", "little"]):
-        severity = 2
+    for level, regex in _SEVERITY_REGEXES:
+        if regex.search(text_lower):
+            severity = level
+            break
 
     return category, severity
 
@@ -333,9 +392,8 @@ def healthcheck() -> HealthResponse:
     return HealthResponse(status="ok", version="0.1.0")
 
 
-@app.get("/debug/routes")
-def debug_routes() -> dict[str, list[str]]:
-    """Registered routes (path -> methods). Remove in production if desired."""
+def _route_table(app: FastAPI) -> dict[str, list[str]]:
+    """Registered routes (path -> methods); WebSocket routes are listed as ["WS"]."""
     routes: dict[str, list[str]] = {}
     for r in app.routes:
         path = getattr(r, "path", None)
@@ -351,13 +409,24 @@ def debug_routes() -> dict[str, list[str]]:
     return routes
 
 
+@app.get("/debug/routes")
+def debug_routes() -> dict[str, list[str]]:
+    """Registered routes (path -> methods). Remove in production if desired."""
+    # The route table is fixed once the app has started; lifespan builds it once
+    return app.state.route_table
+
+
+@app.get("/debug/tts-cache")
+def debug_tts_cache() -> dict[str, Optional[int]]:
+    """Hit/miss counters for the ElevenLabs text-to-speech cache."""
+    return tts_cache_stats()
+
+
 @app.get("/db/health", response_model=DbHealthResponse)
 def db_health() -> DbHealthResponse:
     try:
-        with psycopg.connect(SUPABASE_POSTGRES_URL) as conn:
-            with conn.cursor() as cur:
-                cur.execute("SELECT 1")
-                cur.fetchone()
+        with get_pool().connection() as conn:
+            conn.execute("SELECT 1").fetchone()
         return DbHealthResponse(connected=True)
     except Exception as e:
         raise HTTPException(status_code=503, detail=str(e))
@@ -365,29 +434,278 @@ def db_health() -> DbHealthResponse:
 
 # --- Twilio SMS webhook ---
 
+_URLENCODED = "application/x-www-form-urlencoded"
+
+
+class _LazyJSON:
+    """Log argument serialized only if the record is actually emitted"""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+    def __str__(self) -> str:
+        return orjson.dumps(self.value).decode()
+
+
+async def _twilio_form(request: Request) -> dict[str, str]:
+    """Twilio webhook fields. Twilio posts urlencoded bodies, parsed directly (no multipart parser)."""
+    if request.headers.get("content-type", "").startswith(_URLENCODED):
+        raw = await request.body()
+        return dict(parse_qsl(raw.decode("utf-8"), keep_blank_values=True))
+    form = await request.form()
+    return {k: str(v) for k, v in form.items()}
+
 # Twilio number that uses a dedicated SMS handler (+46 76 479 02 15)
 TWILIO_SPECIALITY_NUMBER = "+46764790083"
 
 
+_NON_DIGIT_RE = re.compile(r"\D+")
+
+
+@lru_cache(maxsize=2048)
 def _normalize_phone_for_compare(phone: str) -> str:
     """Normalize phone to E.164-like form for comparison (e.g. +46764790215)."""
     if not phone:
         return ""
-    digits = "".join(c for c in phone if c.isdigit())
+    digits = _NON_DIGIT_RE.sub("", phone)
     return ("+" + digits) if digits else ""
 
 
+TWILIO_SPECIALITY_NUMBER_NORMALIZED = _normalize_phone_for_compare(TWILIO_SPECIALITY_NUMBER)
+
+
+# Replies by which a notified responder reports arriving at their case, or accepts one
+ARRIVAL_WORDS = frozenset({"ARRIVED", "AT SCENE", "HERE"})
+CONFIRM_WORDS = frozenset({"YES", "OK", "ON MY WAY", "COMING", "RESPONDING"}) | ARRIVAL_WORDS
+
+
+def _responder_reply_sql(
+    expected_status: str, order_column: str, new_status: str, stamp_column: str, description_sql: str
+) -> str:
+    """
+    One statement for a responder's SMS reply: find the active responder by phone, pick their latest
+    Open case in expected_status, move the assignment to new_status (stamping stamp_column) and log
+    the event. Returns one row per responder (name, case columns NULL if they have no such case).
+    """
+    return f"""
+        WITH r AS (
+            SELECT id, name FROM "user"
+            WHERE phone = %s AND role = 'Responder' AND status = 'Active'
+            LIMIT 1
+        ),
+        a AS (
+            SELECT ra.case_id, c.title, c.summary, ra.distance_km
+            FROM responder_assignment ra
+            JOIN "case" c ON ra.case_id = c.id
+            WHERE ra.responder_id = (SELECT id FROM r)
+            AND ra.status = '{expected_status}'
+            AND c.status = 'Open'
+            ORDER BY ra.{order_column} DESC
+            LIMIT 1
+        ),
+        upd AS (
+            UPDATE responder_assignment ra
+            SET status = '{new_status}', {stamp_column} = now()
+            FROM a
+            WHERE ra.case_id = a.case_id AND ra.responder_id = (SELECT id FROM r)
+            RETURNING ra.case_id
+        ),
+        ins AS (
+            INSERT INTO event (case_id, description)
+            SELECT upd.case_id, {description_sql}
+            FROM upd, r, a
+        )
+        SELECT r.name, a.case_id, a.title, a.summary, a.distance_km
+        FROM r LEFT JOIN a ON true
+    """
+
+
+_RESPONDER_ARRIVAL_SQL = _responder_reply_sql(
+    "confirmed",
+    "confirmed_at",
+    "arrived",
+    "arrived_at",
+    "'🚨 Responder ' || r.name || ' has ARRIVED at the emergency scene!'",
+)
+_RESPONDER_CONFIRMATION_SQL = _responder_reply_sql(
+    "notified",
+    "notified_at",
+    "confirmed",
+    "confirmed_at",
+    "'Responder ' || r.name || ' confirmed availability and is en route (distance: '"
+    " || COALESCE(a.distance_km::text, 'unknown') || 'km)'",
+)
+
+
+def _handle_responder_reply(from_number: str, body_upper: str) -> Tuple[bool, Optional[str], Any]:
+    """
+    If from_number is an active responder, record their confirmation/arrival on their latest case.
+    Returns (is_responder_confirmation, response_text, case_id). Blocking: run it in a worker thread.
+    """
+    # Check if this is an arrival notification
+    is_arrival = body_upper in ARRIVAL_WORDS
+    # Lookup, assignment update and event insert are one round-trip
+    with get_pool().connection() as conn:
+        row = conn.execute(
+            _RESPONDER_ARRIVAL_SQL if is_arrival else _RESPONDER_CONFIRMATION_SQL,
+            (from_number,),
+            prepare=PREPARE_HOT,
+        ).fetchone()
+    # The statement logs an event whenever it moved an assignment
+    if row and row["case_id"] is not None:
+        invalidate_reads()
+
+    if not row:
+        return False, None, None
+    name = row["name"]
+    webhook_logger.info("Responder found: %s", name)
+
+    case_id = row["case_id"]
+    if case_id is None:
+        return True, "Thank you for responding! However, we couldn't find an active emergency case. The situation may have been resolved.", None
+
+    if is_arrival:
+        # Send arrival confirmation
+        response_text = "\n".join([
+            f"✅ Arrival confirmed, {name}!",
+            "",
+            "You are now marked as ON SCENE.",
+            "",
+            "⚕️ Please provide emergency assistance as needed.",
+            "📱 Keep this line open for updates.",
+            "",
+            "Thank you for your rapid response!",
+        ])
+    else:
+        # Send confirmation to responder
+        parts = [
+            f"✅ Thank you {name}!",
+            "",
+            "Your response has been confirmed.",
+            "",
+            f"📋 Case: {row['title']}",
+            f"📝 Details: {row['summary'][:100]}...",
+        ]
+        if row.get("distance_km"):
+            parts.append(f"📍 Distance: {row['distance_km']:.1f}km")
+        parts += [
+            "",
+            "⚡ Please proceed to the location safely.",
+            "The victim has been notified that help is on the way.",
+            "",
+            "Reply 'ARRIVED' when you reach the scene.",
+        ]
+        response_text = "\n".join(parts)
+
+    webhook_logger.info("Responder %s confirmed for case %s", name, str(case_id)[:8])
+    return True, response_text, case_id
+
+
+def _conversation_history(from_number: str, before: datetime) -> List[Dict[str, str]]:
+    """Last 10 SMS with from_number created before `before`, oldest first, as chat turns. Blocking."""
+    with get_pool().connection() as conn:
+        with conn.cursor() as cur:
+            # Newest 10 off the (target, created_at) index, flipped to chronological order in SQL
+            cur.execute(
+                """
+                SELECT raw_text, direction
+                FROM (
+                    SELECT raw_text, direction, created_at
+                    FROM text_message
+                    WHERE target = %s
+                    AND created_at < %s
+                    ORDER BY created_at DESC
+                    LIMIT 10
+                ) recent
+                ORDER BY created_at ASC
+                """,
+                (from_number, before),
+                prepare=PREPARE_HOT,
+            )
+            return [
+                {
+                    "role": "user" if msg["direction"] == "Inbound" else "assistant",
+                    "content": msg["raw_text"],
+                }
+                for msg in cur.fetchall()
+            ]
+
+
+async def _send_sms_reply(to_number: str, response_text: str) -> None:
+    """Send the reply SMS and persist it as Outbound (with Twilio's sid, or as failed)."""
+    try:
+        sms_result = await asyncio.to_thread(send_sms, to_number, response_text)
+        await asyncio.to_thread(
+            persist_text_message,
+            target=to_number,
+            raw_text=response_text,
+            direction="Outbound",
+            provider_message_sid=sms_result.message_sid,
+            delivery_status=sms_result.status,
+        )
+        webhook_logger.info(
+            "twilio_sms_response_sent message_sid=%s to_number=%s response_length=%s",
+            sms_result.message_sid,
+            to_number,
+            len(response_text),
+        )
+    except Exception as e:
+        webhook_logger.exception("Failed to send SMS response: %s", e)
+        # Still persist the response even if SMS sending fails
+        try:
+            await asyncio.to_thread(
+                persist_text_message,
+                target=to_number,
+                raw_text=response_text,
+                direction="Outbound",
+                provider_message_sid=None,
+                delivery_status="failed",
+            )
+            webhook_logger.info("Response saved despite SMS failure")
+        except:
+            pass
+
+
+async def _record_sms_case(
+    case_id: str,
+    body: str,
+    message_row_id: str,
+    from_number: str,
+    info: Optional[EmergencyInfo],
+) -> None:
+    """Event linking a newly created case to the inbound SMS that triggered it."""
+    await asyncio.to_thread(
+        persist_event,
+        case_id=case_id,
+        description=f"SMS Emergency: {body[:200]}",
+        text_message_id=message_row_id,
+    )
+    webhook_logger.info(
+        "twilio_sms_case_created case_id=%s from_number=%s",
+        case_id,
+        from_number,
+    )
+
+    # Check if responders were notified
+    if info and info.latitude and info.longitude and info.severity and info.severity >= 3:
+        webhook_logger.info(
+            "High-severity emergency (level %s) with coordinates, responders may have been notified",
+            info.severity,
+        )
+
+
 @app.post("/twilio/webhooks/sms")
 async def twilio_sms_webhook(request: Request) -> Response:
     payload: dict[str, str] = {}
     try:
-        form = await request.form()
-        payload = {k: str(v) for k, v in form.items()}
+        payload = await _twilio_form(request)
         webhook_logger.info(
             "twilio_sms_inbound_received method=%s url=%s payload=%s",
             request.method,
-            str(request.url),
-            json.dumps(payload, ensure_ascii=False),
+            request.url,
+            _LazyJSON(payload),
         )
 
         from_number = payload.get("From", "").strip()
@@ -398,17 +716,20 @@ async def twilio_sms_webhook(request: Request) -> Response:
         if not from_number or not to_number or not body:
             webhook_logger.warning(
                 "twilio_sms_inbound_missing_fields payload=%s",
-                json.dumps(payload, ensure_ascii=False),
+                orjson.dumps(payload).decode(),
             )
             raise HTTPException(status_code=400, detail="Missing Twilio message fields")
 
         # When the Twilio number called is +46 76 479 02 15, run the dedicated handler
-        if _normalize_phone_for_compare(to_number) == TWILIO_SPECIALITY_NUMBER:
-            return handle_sms_speciality_number(from_number, to_number, body, message_sid)
+        if _normalize_phone_for_compare(to_number) == TWILIO_SPECIALITY_NUMBER_NORMALIZED:
+            return await asyncio.to_thread(
+                handle_sms_speciality_number, from_number, to_number, body, message_sid
+            )
            
 
-        # Persist incoming message
-        message_row_id = persist_text_message(
+        # Persist incoming message (blocking DB/Twilio calls below run on worker threads)
+        message_row_id, message_created_at = await asyncio.to_thread(
+            persist_text_message,
             target=from_number,
             raw_text=body,
             direction="Inbound",
@@ -430,155 +751,16 @@ async def twilio_sms_webhook(request: Request) -> Response:
         info = None
 
         # FIRST: Check if this is a responder confirming availability
-        body_upper = body.upper().strip()
-        if body_upper in ["YES", "OK", "ON MY WAY", "COMING", "RESPONDING", "ARRIVED", "AT SCENE", "HERE"]:
+        # body is already stripped
+        body_upper = body.upper()
+        if body_upper in CONFIRM_WORDS:
             try:
-                with psycopg.connect(SUPABASE_POSTGRES_URL, row_factory=dict_row) as conn:
-                    with conn.cursor() as cur:
-                        # Check if this phone number belongs to an active responder
-                        cur.execute(
-                            """
-                            SELECT u.id::text as id, u.name, u.role,
-                                   array_agg(s.name) as specialties
-                            FROM "user" u
-                            LEFT JOIN user_specialty us ON u.id = us.user_id
-                            LEFT JOIN specialty s ON us.specialty_id = s.id
-                            WHERE u.phone = %s
-                            AND u.role = 'Responder'
-                            AND u.status = 'Active'
-                            GROUP BY u.id::text, u.name, u.role
-                            """,
-                            (from_number,),
-                        )
-                        responder = cur.fetchone()
-
-                        if responder:
-                            webhook_logger.info(f"Responder found: {responder}")
-                            is_responder_confirmation = True
-
-                            # Check if this is an arrival notification
-                            is_arrival = body_upper in ["ARRIVED", "AT SCENE", "HERE"]
-
-                            # Get responder_id as string
-                            responder_id = str(responder["id"]) if responder.get("id") else None
-                            webhook_logger.info(f"Using responder_id: {responder_id}")
-
-                            # Find the case they were assigned to
-                            if is_arrival:
-                                # Look for confirmed assignment
-                                cur.execute(
-                                    """
-                                    SELECT c.id, c.title, c.summary, ra.distance_km
-                                    FROM responder_assignment ra
-                                    JOIN "case" c ON ra.case_id = c.id
-                                    WHERE ra.responder_id = %s
-                                    AND ra.status = 'confirmed'
-                                    AND c.status = 'Open'
-                                    ORDER BY ra.confirmed_at DESC
-                                    LIMIT 1
-                                    """,
-                                    (responder_id,),
-                                )
-                            else:
-                                # Look for notified assignment
-                                cur.execute(
-                                    """
-                                    SELECT c.id, c.title, c.summary, ra.distance_km
-                                    FROM responder_assignment ra
-                                    JOIN "case" c ON ra.case_id = c.id
-                                    WHERE ra.responder_id = %s
-                                    AND ra.status = 'notified'
-                                    AND c.status = 'Open'
-                                    ORDER BY ra.notified_at DESC
-                                    LIMIT 1
-                                    """,
-                                    (responder_id,),
-                                )
-                            recent_case = cur.fetchone()
-
-                            if recent_case:
-                                case_id = recent_case["id"]
-
-                                if is_arrival:
-                                    # Handle arrival notification
-                                    cur.execute(
-                                        """
-                                        UPDATE responder_assignment
-                                        SET status = 'arrived', arrived_at = %s
-                                        WHERE case_id = %s AND responder_id = %s
-                                        """,
-                                        (datetime.now(), case_id, responder_id),
-                                    )
-
-                                    # Log the arrival event
-                                    event_id = str(uuid.uuid4())
-                                    cur.execute(
-                                        """
-                                        INSERT INTO event (id, case_id, timestamp, description)
-                                        VALUES (%s, %s, %s, %s)
-                                        """,
-                                        (
-                                            event_id,
-                                            case_id,
-                                            datetime.now(),
-                                            f"🚨 Responder {responder['name']} has ARRIVED at the emergency scene!",
-                                        ),
-                                    )
-                                    conn.commit()
-
-                                    # Send arrival confirmation
-                                    response_text = f"✅ Arrival confirmed, {responder['name']}!\n\n"
-                                    response_text += "You are now marked as ON SCENE.\n\n"
-                                    response_text += "⚕️ Please provide emergency assistance as needed.\n"
-                                    response_text += "📱 Keep this line open for updates.\n\n"
-                                    response_text += "Thank you for your rapid response!"
-                                else:
-                                    # Handle initial confirmation
-                                    cur.execute(
-                                        """
-                                        UPDATE responder_assignment
-                                        SET status = 'confirmed', confirmed_at = %s
-                                        WHERE case_id = %s AND responder_id = %s
-                                        """,
-                                        (datetime.now(), case_id, responder_id),
-                                    )
-
-                                    # Log the confirmation event
-                                    event_id = str(uuid.uuid4())
-                                    cur.execute(
-                                        """
-                                        INSERT INTO event (id, case_id, timestamp, description)
-                                        VALUES (%s, %s, %s, %s)
-                                        """,
-                                        (
-                                            event_id,
-                                            case_id,
-                                            datetime.now(),
-                                            f"Responder {responder['name']} confirmed availability and is en route (distance: {recent_case.get('distance_km', 'unknown')}km)",
-                                        ),
-                                    )
-                                    conn.commit()
-
-                                    # Send confirmation to responder
-                                    response_text = f"✅ Thank you {responder['name']}!\n\n"
-                                    response_text += f"Your response has been confirmed.\n\n"
-                                    response_text += f"📋 Case: {recent_case['title']}\n"
-                                    response_text += f"📝 Details: {recent_case['summary'][:100]}...\n"
-                                    if recent_case.get("distance_km"):
-                                        response_text += f"📍 Distance: {recent_case['distance_km']:.1f}km\n"
-                                    response_text += "\n⚡ Please proceed to the location safely.\n"
-                                    response_text += "The victim has been notified that help is on the way.\n\n"
-                                    response_text += "Reply 'ARRIVED' when you reach the scene."
-
-                                webhook_logger.info(
-                                    f"Responder {responder['name']} confirmed for case {str(case_id)[:8]}"
-                                )
-                            else:
-                                response_text = "Thank you for responding! However, we couldn't find an active emergency case. The situation may have been resolved."
-            except Exception as e:
-                import traceback
-                webhook_logger.error(f"Error checking responder status: {e}")
-                webhook_logger.error(f"Full traceback: {traceback.format_exc()}")
+                # The queries are blocking psycopg calls; a worker thread keeps the event loop free
+                is_responder_confirmation, response_text, case_id = await asyncio.to_thread(
+                    _handle_responder_reply, from_number, body_upper
+                )
+            except Exception:
+                webhook_logger.exception("Error checking responder status")
                 is_responder_confirmation = False
 
         # SECOND: If not a responder confirmation, process as normal emergency message
@@ -586,99 +768,31 @@ async def twilio_sms_webhook(request: Request) -> Response:
             # Get conversation history for this phone number
             conversation_history = []
             try:
-                with psycopg.connect(SUPABASE_POSTGRES_URL, row_factory=dict_row) as conn:
-                    with conn.cursor() as cur:
-                        cur.execute(
-                            """
-                            SELECT raw_text, direction, created_at
-                            FROM text_message
-                            WHERE target = %s
-                            AND created_at < (SELECT created_at FROM text_message WHERE id = %s)
-                            ORDER BY created_at DESC
-                            LIMIT 10
-                            """,
-                            (from_number, message_row_id),
-                        )
-                        messages = cur.fetchall()
-
-                        for msg in reversed(messages):
-                            if msg["direction"] == "Inbound":
-                                conversation_history.append(
-                                    {"role": "user", "content": msg["raw_text"]}
-                                )
-                            else:
-                                conversation_history.append(
-                                    {"role": "assistant", "content": msg["raw_text"]}
-                                )
+                conversation_history = await asyncio.to_thread(
+                    _conversation_history, from_number, message_created_at
+                )
             except Exception as e:
-                webhook_logger.error(f"Failed to get conversation history: {e}")
+                webhook_logger.exception("Failed to get conversation history: %s", e)
 
             # Process message through the AI agent
             try:
-                agent = EmergencyAgent(SUPABASE_POSTGRES_URL)
-                user_id = str(uuid.uuid4())
-                response_text, case_id, info = agent.process_message(
-                    body, conversation_history, user_id, SUPABASE_POSTGRES_URL
+                # No user id: a new user row gets its id from Postgres if a case is created
+                response_text, case_id, info = await _emergency_agent.process_message(
+                    body, conversation_history, None, SUPABASE_POSTGRES_URL
                 )
             except Exception as e:
                 webhook_logger.exception("agent.process_message failed: %s", e)
                 response_text = "Emergency system received your message. If urgent, please call 112."
 
-        # THIRD: Send SMS response
+        # THIRD: Send the SMS response and log case creation (only for new emergencies, not
+        # responder confirmations). Independent of each other, so the Twilio POST and the
+        # event insert run concurrently.
+        steps = []
         if response_text:
-            # Limit SMS response to 1600 characters
-            if len(response_text) > 1600:
-                response_text = response_text[:1597] + "..."
-
-            try:
-                sms_result = send_sms(from_number, response_text)
-                persist_text_message(
-                    target=from_number,
-                    raw_text=response_text,
-                    direction="Outbound",
-                    provider_message_sid=sms_result.message_sid,
-                    delivery_status=sms_result.status,
-                )
-                webhook_logger.info(
-                    "twilio_sms_response_sent message_sid=%s to_number=%s response_length=%s",
-                    sms_result.message_sid,
-                    from_number,
-                    len(response_text),
-                )
-            except Exception as e:
-                webhook_logger.error(f"Failed to send SMS response: {e}")
-                # Still persist the response even if SMS sending fails
-                try:
-                    persist_text_message(
-                        target=from_number,
-                        raw_text=response_text,
-                        direction="Outbound",
-                        provider_message_sid=None,
-                        delivery_status="failed",
-                    )
-                    webhook_logger.info(f"Response saved despite SMS failure")
-                except:
-                    pass
-
-        # FOURTH: Log case creation if applicable (only for new emergencies, not responder confirmations)
+            steps.append(_send_sms_reply(from_number, truncate_sms_body(response_text)))
         if case_id and not is_responder_confirmation:
-            persist_event(
-                case_id=case_id,
-                description=f"SMS Emergency: {body[:200]}",
-                text_message_id=message_row_id,
-            )
-            webhook_logger.info(
-                "twilio_sms_case_created case_id=%s from_number=%s",
-                case_id,
-                from_number,
-            )
-
-            # Check if responders were notified
-            if info and info.latitude and info.longitude and info.severity and info.severity >= 3:
-                webhook_logger.info(
-                    "High-severity emergency (level %s) with coordinates, responders may have been notified",
-                    info.severity,
-                )
+            steps.append(_record_sms_case(case_id, body, message_row_id, from_number, info))
+        await asyncio.gather(*steps)
 
         webhook_logger.info("twilio_sms_inbound_processed message_sid=%s", message_sid)
         return Response(
@@ -691,7 +805,7 @@ async def twilio_sms_webhook(request: Request) -> Response:
     except Exception:
         webhook_logger.exception(
             "twilio_sms_inbound_failed payload=%s",
-            json.dumps(payload, ensure_ascii=False),
+            orjson.dumps(payload).decode(),
         )
         raise
 
@@ -705,8 +819,7 @@ async def twilio_voice_webhook(request: Request) -> Response:
     """Answer call with TwiML: connect to Media Stream (if VOICE_STREAM_WS_URL set) or say and hang up."""
     payload: dict[str, str] = {}
     try:
-        form = await request.form()
-        payload = {k: str(v) for k, v in form.items()}
+        payload = await _twilio_form(request)
         call_sid = payload.get("CallSid", "").strip()
         from_number = payload.get("From", "").strip()
         to_number = payload.get("To", "").strip()
@@ -742,7 +855,7 @@ async def twilio_voice_webhook(request: Request) -> Response:
     except Exception:
         webhook_logger.exception(
             "twilio_voice_webhook_failed payload=%s",
-            json.dumps(payload, ensure_ascii=False),
+            orjson.dumps(payload).decode(),
         )
         raise
 
@@ -764,8 +877,7 @@ async def twilio_voice_elevenlabs_webhook(request: Request) -> Response:
     """Answer call with TwiML pointing to the ElevenLabs voice WebSocket stream."""
     payload: dict[str, str] = {}
     try:
-        form = await request.form()
-        payload = {k: str(v) for k, v in form.items()}
+        payload = await _twilio_form(request)
         call_sid = payload.get("CallSid", "").strip()
         from_number = payload.get("From", "").strip()
         to_number = payload.get("To", "").strip()
@@ -785,7 +897,7 @@ async def twilio_voice_elevenlabs_webhook(request: Request) -> Response:
         webhook_logger.info("twilio_voice_elevenlabs_connect call_sid=%s ws_url=%s", call_sid, ws_url)
         return Response(content=twiml, media_type="application/xml", status_code=200)
     except Exception:
-        webhook_logger.exception("twilio_voice_elevenlabs_webhook_failed payload=%s", json.dumps(payload, ensure_ascii=False))
+        webhook_logger.exception("twilio_voice_elevenlabs_webhook_failed payload=%s", orjson.dumps(payload).decode())
         raise
 
 
@@ -809,7 +921,7 @@ def send_message(payload: SendSmsRequest) -> SendSmsResponse:
 
     persistence_error: str | None = None
     try:
-        message_row_id = persist_text_message(
+        message_row_id, _ = persist_text_message(
             target=result.to_number,
             raw_text=payload.body,
             direction="Outbound",
@@ -839,20 +951,18 @@ def send_message(payload: SendSmsRequest) -> SendSmsResponse:
 
 # User Management Endpoints
 @app.post("/users/register", response_model=UserResponse)
-async def register_user(user: UserRegister) -> UserResponse:
+def register_user(user: UserRegister) -> UserResponse:
     """Register a new user in the system."""
     try:
-        with psycopg.connect(SUPABASE_POSTGRES_URL, row_factory=dict_row) as conn:
+        with get_pool().connection() as conn:
             with conn.cursor() as cur:
-                user_id = str(uuid.uuid4())
                 cur.execute(
                     """
-                    INSERT INTO "user" (id, name, phone, role, status, location, latitude, longitude)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                    INSERT INTO "user" (name, phone, role, status, location, latitude, longitude)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
                     RETURNING *
                     """,
                     (
-                        user_id,
                         user.name,
                         user.phone,
                         user.role,
@@ -864,25 +974,21 @@ async def register_user(user: UserRegister) -> UserResponse:
                 )
                 result = cur.fetchone()
                 conn.commit()
-                # Convert UUID to string
-                result["id"] = str(result["id"])
                 return UserResponse(**result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/users/me", response_model=UserResponse)
-async def get_current_user(user_id: str = Header(alias="X-User-Id")) -> UserResponse:
+def get_current_user(user_id: str = Header(alias="X-User-Id")) -> UserResponse:
     """Get current user information."""
     try:
-        with psycopg.connect(SUPABASE_POSTGRES_URL, row_factory=dict_row) as conn:
+        with get_pool().connection() as conn:
             with conn.cursor() as cur:
                 cur.execute('SELECT * FROM "user" WHERE id = %s', (user_id,))
                 result = cur.fetchone()
                 if not result:
                     raise HTTPException(status_code=404, detail="User not found")
-                # Convert UUID to string
-                result["id"] = str(result["id"])
                 return UserResponse(**result)
     except HTTPException:
         raise
@@ -890,6 +996,22 @@ async def get_current_user(user_id: str = Header(alias="X-User-Id")) -> UserResp
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@lru_cache(maxsize=4096)
+def _speciality_query_vector(query: str) -> np.ndarray:
+    """
+    float32 embedding of the query, sent to Postgres as a binary vector. Searches repeat a handful
+    of short queries ("nurse", "doctor"), so repeats skip the OpenAI round-trip; failures are not cached.
+    """
+    resp = get_openai_client().embeddings.create(
+        input=query,
+        model="text-embedding-3-small",
+    )
+    vec = np.asarray(resp.data[0].embedding, dtype=np.float32)
+    # Shared by every cache hit
+    vec.flags.writeable = False
+    return vec
+
+
 @app.get("/users/search-by-speciality", response_model=List[UserWithNotifiedResponse])
 def search_users_by_speciality(
     lat: float,
@@ -902,23 +1024,16 @@ def search_users_by_speciality(
     if not OPENAI_API_KEY:
         raise HTTPException(status_code=503, detail="OPENAI_API_KEY not set")
     try:
-        from openai import OpenAI
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        resp = client.embeddings.create(
-            input=query,
-            model="text-embedding-3-small",
-        )
-        embedding = resp.data[0].embedding
+        query_vec = _speciality_query_vector(" ".join(query.split()).lower())
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"Embedding failed: {e}")
-    vec_str = "[" + ",".join(str(x) for x in embedding) + "]"
     case_uuid = uuid.UUID(case_id) if case_id else None
     try:
-        with psycopg.connect(SUPABASE_POSTGRES_URL, row_factory=dict_row) as conn:
+        with get_pool().connection() as conn:
             with conn.cursor() as cur:
                 cur.execute(
-                    """SELECT * FROM search_users_by_embedding_and_location(%s::vector, %s, %s, %s, %s)""",
-                    (vec_str, lat, lng, max_match_count, case_uuid),
+                    """SELECT * FROM search_users_by_embedding_and_location(%b::vector, %s, %s, %s, %s)""",
+                    (query_vec, lat, lng, max_match_count, case_uuid),
                 )
                 rows = cur.fetchall()
     except Exception as e:
@@ -926,7 +1041,6 @@ def search_users_by_speciality(
     out = []
     for r in rows:
         r = dict(r)
-        r["id"] = str(r["id"])
         r["skills"] = list(r["skills"]) if r.get("skills") else []
         r["accepted_for_case"] = bool(r.get("accepted_for_case"))
         # Use RPC distance when present (migration 025); else compute so response is never null
@@ -954,7 +1068,7 @@ def dispatch_case_to_user(body: DispatchCaseToUserRequest) -> DispatchCaseToUser
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid case_id or user_id")
 
-    with psycopg.connect(SUPABASE_POSTGRES_URL, row_factory=dict_row) as conn:
+    with get_pool().connection() as conn:
         with conn.cursor() as cur:
             cur.execute(
                 """SELECT id, title, summary FROM "case" WHERE id = %s""",
@@ -974,20 +1088,19 @@ def dispatch_case_to_user(body: DispatchCaseToUserRequest) -> DispatchCaseToUser
                 raise HTTPException(status_code=400, detail="User has no phone number")
 
             description = (case_row.get("summary") or case_row.get("title") or "Emergency case")[:200]
-            now = datetime.utcnow()
             cur.execute(
                 """
                 INSERT INTO responder_assignment
                 (case_id, responder_id, status, notified_at)
-                VALUES (%s, %s, 'notified', %s)
+                VALUES (%s, %s, 'notified', now())
                 ON CONFLICT (case_id, responder_id) DO UPDATE
-                SET status = 'notified', notified_at = %s
+                SET status = 'notified', notified_at = now()
                 RETURNING id
                 """,
-                (case_uuid, responder_uuid, now, now),
+                (case_uuid, responder_uuid),
             )
             row = cur.fetchone()
-            assignment_id = str(row["id"]) if row else None
+            assignment_id = row["id"] if row else None
             conn.commit()
 
     message = (
@@ -1009,7 +1122,7 @@ def dispatch_case_to_user(body: DispatchCaseToUserRequest) -> DispatchCaseToUser
 
 # Emergency Request Endpoint
 @app.post("/emergency", response_model=CaseResponse)
-async def create_emergency(
+def create_emergency(
     request: EmergencyRequest, user_id: str = Header(alias="X-User-Id")
 ) -> CaseResponse:
     """Create an emergency case from a request."""
@@ -1017,60 +1130,45 @@ async def create_emergency(
         # Categorize the emergency
         category, severity = categorize_emergency(request.message)
 
-        with psycopg.connect(SUPABASE_POSTGRES_URL, row_factory=dict_row) as conn:
+        # One statement: the case, its initial message and its event log entry are inserted
+        # together, with ids from the gen_random_uuid() column defaults
+        with get_pool().connection() as conn:
             with conn.cursor() as cur:
-                case_id = str(uuid.uuid4())
-                now = datetime.utcnow()
-
-                # Create the case with title
                 title = f"{category.replace('_', ' ').title()} Emergency"
                 cur.execute(
                     """
-                    INSERT INTO "case" (id, title, summary, severity, status, category, created_at, updated_at)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                    RETURNING *
+                    WITH new_case AS (
+                        INSERT INTO "case" (title, summary, severity, status, category)
+                        VALUES (%s, LEFT(%s, 200), %s, %s, %s)
+                        RETURNING *
+                    ),
+                    new_message AS (
+                        INSERT INTO text_message (source, target, raw_text, user_id)
+                        VALUES (%s, %s, %s, %s)
+                    ),
+                    new_event AS (
+                        INSERT INTO event (case_id, description)
+                        SELECT id, %s FROM new_case
+                    )
+                    SELECT * FROM new_case
                     """,
                     (
-                        case_id,
                         title,
-                        request.message[:200],
+                        request.message,
                         severity,
                         "Open",
                         category,
-                        now,
-                        now,
-                    ),
-                )
-                case_result = cur.fetchone()
-                # Convert UUID to string
-                case_result["id"] = str(case_result["id"])
-
-                # Store the initial message
-                message_id = str(uuid.uuid4())
-                cur.execute(
-                    """
-                    INSERT INTO text_message (id, source, target, raw_text, user_id, created_at)
-                    VALUES (%s, %s, %s, %s, %s, %s)
-                    """,
-                    (message_id, "SMS", "emergency", request.message, user_id, now),
-                )
-
-                # Create an event log entry
-                event_id = str(uuid.uuid4())
-                cur.execute(
-                    """
-                    INSERT INTO event (id, case_id, timestamp, description)
-                    VALUES (%s, %s, %s, %s)
-                    """,
-                    (
-                        event_id,
-                        case_id,
-                        now,
+                        "SMS",
+                        "emergency",
+                        request.message,
+                        user_id,
                         f"Emergency case created: {category} - Severity {severity}",
                     ),
                 )
+                case_result = cur.fetchone()
 
                 conn.commit()
+                invalidate_reads()
                 return CaseResponse(**case_result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1081,7 +1179,7 @@ async def debug_quick_emergency(request: Request) -> Dict:
     """Debug endpoint: log the raw body ElevenLabs sends."""
     body = await request.body()
     webhook_logger.info("quick_emergency_debug raw_body=%s", body.decode("utf-8", errors="replace")[:2000])
-    return {"received": json.loads(body)}
+    return {"received": orjson.loads(body)}
 
 
 @app.post("/emergency/quick", response_model=CaseResponse)
@@ -1098,17 +1196,11 @@ async def create_quick_emergency(request: QuickEmergencyRequest) -> CaseResponse
             stress_level=request.stress_level,
         )
 
-        from geopy.geocoders import GoogleV3
-        from geopy.exc import GeocoderTimedOut, GeocoderServiceError
-        from env import GOOGLE_MAPS_API_KEY, SUPABASE_URL
-
-        def _geocode_and_save() -> dict:
+        def _geocode() -> str | None:
             lat, lng, maps_url = None, None, None
             try:
-                geocoder = GoogleV3(api_key=GOOGLE_MAPS_API_KEY)
-                result = geocoder.geocode(info.location)
-                if result:
-                    lat, lng = result.latitude, result.longitude
+                lat, lng = geocode(info.location)
+                if lat is not None:
                     maps_url = f"https://www.google.com/maps?q={lat},{lng}"
             except (GeocoderTimedOut, GeocoderServiceError) as e:
                 webhook_logger.warning("quick_emergency_geocode_error: %s", e)
@@ -1117,135 +1209,140 @@ async def create_quick_emergency(request: QuickEmergencyRequest) -> CaseResponse
 
             info.latitude = lat
             info.longitude = lng
+            return maps_url
 
+        def _save(agent: EmergencyAgent) -> dict:
             user_id = str(uuid.uuid5(uuid.NAMESPACE_URL, f"quick-{info.social_security_number}"))
-            agent = EmergencyAgent(SUPABASE_URL)
-            agent.analyse_emergency(info)
-            with psycopg.connect(SUPABASE_POSTGRES_URL, row_factory=dict_row) as conn:
+            with get_pool().connection() as conn:
                 case_id = agent.create_case(info, user_id, conn)
 
                 with conn.cursor() as cur:
                     cur.execute('SELECT * FROM "case" WHERE id = %s', (case_id,))
                     case_row = cur.fetchone()
-                    case_row["id"] = str(case_row["id"])
-
-            case_row["maps_url"] = maps_url
             return case_row
 
-        case_row = await asyncio.to_thread(_geocode_and_save)
+        maps_url = await asyncio.to_thread(_geocode)
+        await _emergency_agent.analyse_emergency(info)
+        case_row = await asyncio.to_thread(_save, _emergency_agent)
+        case_row["maps_url"] = maps_url
         return CaseResponse(**case_row)
     except Exception as e:
         webhook_logger.exception("quick_emergency_error")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Read-only lists whose rows already match their response model: Postgres serializes the whole
+# array (uuids, timestamps and all) in one pass, so no row dicts or Pydantic models are built and
+# FastAPI does not re-encode. The subquery's ORDER BY carries into json_agg. Nothing validates the
+# output, so a column behind a non-Optional model field is coalesced unless the schema rules out NULL.
+_JSON_ARRAY_SQL = """
+    SELECT coalesce(json_agg(t), '[]')::text AS body
+    FROM ({rows}) t
+"""
+
+
+def _json_response(body: str | bytes) -> Response:
+    return Response(content=body, media_type="application/json")
+
+
 # Messages Endpoints
 @app.get("/messages/{case_id}", response_model=List[MessageResponse])
-async def get_case_messages(case_id: str) -> List[MessageResponse]:
+def get_case_messages(case_id: str) -> Response:
     """Get all messages for a specific case."""
     try:
-        with psycopg.connect(SUPABASE_POSTGRES_URL, row_factory=dict_row) as conn:
+        with get_pool().connection() as conn:
             with conn.cursor() as cur:
+                # Postgres builds the MessageResponse array itself (see _JSON_ARRAY_SQL)
                 cur.execute(
-                    """
-                    SELECT
-                        e.id,
-                        e.description as text,
-                        e.case_id,
-                        e.timestamp as created_at,
-                        tm.user_id,
-                        u.name as user_name
-                    FROM event e
-                    LEFT JOIN text_message tm ON tm.id = e.text_message_id
-                    LEFT JOIN "user" u ON u.id = tm.user_id
-                    WHERE e.case_id = %s
-                    ORDER BY e.timestamp ASC
-                    """,
+                    _JSON_ARRAY_SQL.format(
+                        rows="""
+                        SELECT
+                            e.id,
+                            coalesce(e.description, '') as text,
+                            e.case_id,
+                            e.timestamp as created_at,
+                            tm.user_id,
+                            u.name as user_name,
+                            false AS is_emergency
+                        FROM event e
+                        LEFT JOIN text_message tm ON tm.id = e.text_message_id
+                        LEFT JOIN "user" u ON u.id = tm.user_id
+                        WHERE e.case_id = %s
+                        ORDER BY e.timestamp ASC
+                        """
+                    ),
                     (case_id,),
+                    prepare=PREPARE_HOT,
                 )
-                results = cur.fetchall()
-                # Convert UUIDs to strings and prepare response
-                messages = []
-                for r in results:
-                    r["id"] = str(r["id"])
-                    if r.get("case_id"):
-                        r["case_id"] = str(r["case_id"])
-                    if r.get("user_id"):
-                        r["user_id"] = str(r["user_id"])
-                    messages.append(MessageResponse(**{**r, "is_emergency": False}))
-                return messages
+                return _json_response(cur.fetchone()["body"])
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# /messages in one statement: store the message, the new case (emergency messages) or the given
+# case id, the event linking them when there is a case, and look up the sender's name. Ids come
+# from the gen_random_uuid() column defaults.
+_SEND_MESSAGE_SQL = """
+    WITH new_message AS (
+        INSERT INTO text_message (source, target, raw_text, user_id)
+        VALUES (%s, %s, %s, %s)
+        RETURNING id, created_at
+    ),
+    {target_case},
+    new_event AS (
+        INSERT INTO event (case_id, description, text_message_id)
+        SELECT t.id, %s, m.id
+        FROM target_case t, new_message m
+        WHERE t.id IS NOT NULL
+    )
+    SELECT
+        m.id::text AS id,
+        m.created_at,
+        (SELECT id::text FROM target_case) AS case_id,
+        (SELECT name FROM "user" WHERE id = %s) AS user_name
+    FROM new_message m
+"""
+_SEND_MESSAGE_NEW_CASE_SQL = """new_case AS (
+        INSERT INTO "case" (title, summary, severity, status, category)
+        VALUES (%s, LEFT(%s, 200), %s, %s, %s)
+        RETURNING id
+    ),
+    target_case AS (SELECT id FROM new_case)"""
+_SEND_MESSAGE_EXISTING_CASE_SQL = "target_case AS (SELECT %s::uuid AS id)"
+
+
 @app.post("/messages", response_model=MessageResponse)
-async def send_message(
+def send_message(
     message: MessageCreate, user_id: str = Header(alias="X-User-Id")
 ) -> MessageResponse:
     """Send a message in a case conversation."""
     try:
-        with psycopg.connect(SUPABASE_POSTGRES_URL, row_factory=dict_row) as conn:
-            with conn.cursor() as cur:
-                message_id = str(uuid.uuid4())
-                now = datetime.utcnow()
-
-                # Store the message
-                cur.execute(
-                    """
-                    INSERT INTO text_message (id, source, target, raw_text, user_id, created_at)
-                    VALUES (%s, %s, %s, %s, %s, %s)
-                    RETURNING *
-                    """,
-                    (message_id, "SMS", "chat", message.text, user_id, now),
-                )
-                msg_result = cur.fetchone()
-
-                # If it's an emergency message, create a new case
-                if message.is_emergency:
-                    category, severity = categorize_emergency(message.text)
-                    case_id = str(uuid.uuid4())
-                    title = f"{category.replace('_', ' ').title()} Emergency"
-                    cur.execute(
-                        """
-                        INSERT INTO "case" (id, title, summary, severity, status, category, created_at, updated_at)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                        """,
-                        (
-                            case_id,
-                            title,
-                            message.text[:200],
-                            severity,
-                            "Open",
-                            category,
-                            now,
-                            now,
-                        ),
-                    )
-                    message.case_id = case_id
-
-                # Log the event if associated with a case
-                if message.case_id:
-                    event_id = str(uuid.uuid4())
-                    cur.execute(
-                        """
-                        INSERT INTO event (id, case_id, timestamp, description, text_message_id)
-                        VALUES (%s, %s, %s, %s, %s)
-                        """,
-                        (event_id, message.case_id, now, message.text, message_id),
-                    )
+        params: list = ["SMS", "chat", message.text, user_id]
+        # If it's an emergency message, create a new case
+        if message.is_emergency:
+            category, severity = categorize_emergency(message.text)
+            title = f"{category.replace('_', ' ').title()} Emergency"
+            case_sql = _SEND_MESSAGE_NEW_CASE_SQL
+            params += [title, message.text, severity, "Open", category]
+        else:
+            case_sql = _SEND_MESSAGE_EXISTING_CASE_SQL
+            params.append(message.case_id)
+        params += [message.text, user_id]
 
-                # Get user name
-                cur.execute('SELECT name FROM "user" WHERE id = %s', (user_id,))
-                user = cur.fetchone()
+        with get_pool().connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(_SEND_MESSAGE_SQL.format(target_case=case_sql), params)
+                row = cur.fetchone()
 
                 conn.commit()
+                invalidate_reads()
                 return MessageResponse(
-                    id=message_id,
+                    id=row["id"],
                     text=message.text,
-                    case_id=message.case_id,
+                    case_id=row["case_id"],
                     user_id=user_id,
-                    user_name=user["name"] if user else None,
-                    created_at=now,
+                    user_name=row["user_name"],
+                    created_at=row["created_at"],
                     is_emergency=message.is_emergency,
                 )
     except Exception as e:
@@ -1253,87 +1350,97 @@ async def send_message(
 
 
 # Case Management Endpoints
+
+
+def _load_cases(role: Optional[str], user_id: str) -> List[CaseResponse]:
+    """Cases visible to a user in the given role. Blocking."""
+    with get_pool().connection() as conn:
+        with conn.cursor() as cur:
+            if role == "Responder":
+                # Show all open cases for responders with maps URL from latest event
+                cur.execute(
+                    """
+                    SELECT c.*, e.maps_url
+                    FROM "case" c
+                    LEFT JOIN LATERAL (
+                        SELECT maps_url
+                        FROM event
+                        WHERE case_id = c.id AND maps_url IS NOT NULL
+                        ORDER BY timestamp DESC
+                        LIMIT 1
+                    ) e ON TRUE
+                    WHERE c.status IN ('Open', 'In Progress')
+                    ORDER BY c.severity DESC, c.created_at DESC
+                    """,
+                    prepare=PREPARE_HOT,
+                )
+            elif role == "Victim":
+                # Show cases created by or assigned to this user
+                # Each side of the UNION is an index seek on user_id; UNION also de-duplicates
+                cur.execute(
+                    """
+                    WITH mine AS (
+                        SELECT case_id FROM case_assigned_helpers WHERE user_id = %s
+                        UNION
+                        SELECT e.case_id FROM event e
+                        JOIN text_message tm ON e.text_message_id = tm.id
+                        WHERE tm.user_id = %s
+                    )
+                    SELECT c.* FROM "case" c
+                    JOIN mine ON mine.case_id = c.id
+                    ORDER BY c.created_at DESC
+                    """,
+                    (user_id, user_id),
+                    prepare=PREPARE_HOT,
+                )
+            else:
+                # Admin or default - show all cases
+                cur.execute(
+                    """
+                    SELECT * FROM "case"
+                    ORDER BY created_at DESC
+                    """,
+                    prepare=PREPARE_HOT,
+                )
+
+            results = cur.fetchall()
+            return [CaseResponse(**r) for r in results]
+
+
 @app.get("/cases", response_model=List[CaseResponse])
-async def get_cases(
+def get_cases(
     role: Optional[str] = Query(None), user_id: str = Header(alias="X-User-Id")
 ) -> List[CaseResponse]:
     """Get cases based on user role."""
     try:
-        with psycopg.connect(SUPABASE_POSTGRES_URL, row_factory=dict_row) as conn:
-            with conn.cursor() as cur:
-                if role == "Responder":
-                    # Show all open cases for responders with maps URL from latest event
-                    cur.execute(
-                        """
-                        SELECT c.*, e.maps_url
-                        FROM "case" c
-                        LEFT JOIN LATERAL (
-                            SELECT maps_url
-                            FROM event
-                            WHERE case_id = c.id AND maps_url IS NOT NULL
-                            ORDER BY timestamp DESC
-                            LIMIT 1
-                        ) e ON TRUE
-                        WHERE c.status IN ('Open', 'In Progress')
-                        ORDER BY c.severity DESC, c.created_at DESC
-                        """
-                    )
-                elif role == "Victim":
-                    # Show cases created by or assigned to this user
-                    cur.execute(
-                        """
-                        SELECT DISTINCT c.* FROM "case" c
-                        LEFT JOIN case_assigned_helpers cah ON c.id = cah.case_id
-                        WHERE cah.user_id = %s OR c.id IN (
-                            SELECT case_id FROM event e
-                            JOIN text_message tm ON e.text_message_id = tm.id
-                            WHERE tm.user_id = %s
-                        )
-                        ORDER BY c.created_at DESC
-                        """,
-                        (user_id, user_id),
-                    )
-                else:
-                    # Admin or default - show all cases
-                    cur.execute(
-                        """
-                        SELECT * FROM "case"
-                        ORDER BY created_at DESC
-                        """
-                    )
-
-                results = cur.fetchall()
-                # Convert UUIDs to strings
-                for r in results:
-                    r["id"] = str(r["id"])
-                return [CaseResponse(**r) for r in results]
+        if role == "Responder":
+            # The same list for every responder, so one cached result serves all their dashboards
+            return cached_read(("cases", role), lambda: _load_cases(role, user_id))
+        return _load_cases(role, user_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/events/live", response_model=List[LiveEventResponse])
-async def get_live_events(
-    limit: int = Query(200, ge=1, le=500)
-) -> List[LiveEventResponse]:
-    """Get latest geolocated events enriched with case status/severity."""
-    try:
-        with psycopg.connect(SUPABASE_POSTGRES_URL, row_factory=dict_row) as conn:
-            with conn.cursor() as cur:
-                cur.execute(
-                    """
+def _load_live_events(limit: int) -> bytes:
+    """Latest `limit` geolocated events with their case fields, as a LiveEventResponse JSON array. Blocking."""
+    with get_pool().connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                _JSON_ARRAY_SQL.format(
+                    rows="""
                     SELECT
                         e.id AS event_id,
                         e.case_id,
-                        e.description,
+                        coalesce(e.description, '') AS description,
                         e.latitude,
                         e.longitude,
                         e.timestamp,
-                        c.severity AS case_severity,
+                        coalesce(c.severity, 3) AS case_severity,
                         c.status AS case_status,
                         c.category AS case_category,
                         c.title AS case_title,
                         c.completed_at,
-                        c.p2p,
+                        coalesce(c.p2p, false) AS p2p,
                         c.confidence,
                         c.required_capability,
                         c.parsed_need_type,
@@ -1343,29 +1450,37 @@ async def get_live_events(
                     WHERE e.latitude IS NOT NULL AND e.longitude IS NOT NULL
                     ORDER BY e.timestamp DESC
                     LIMIT %s
-                    """,
-                    (limit,),
-                )
-                results = cur.fetchall()
+                    """
+                ),
+                (limit,),
+                prepare=PREPARE_HOT,
+            )
+            return cur.fetchone()["body"].encode()
 
-                for row in results:
-                    row["event_id"] = str(row["event_id"])
-                    row["case_id"] = str(row["case_id"])
 
-                return [LiveEventResponse(**row) for row in results]
+@app.get("/events/live", response_model=List[LiveEventResponse])
+def get_live_events(
+    limit: int = Query(200, ge=1, le=500)
+) -> Response:
+    """Get latest geolocated events enriched with case status/severity."""
+    try:
+        # The cache holds the encoded body, so a hit is sent as-is
+        return _json_response(
+            cached_read(("events/live", limit), lambda: _load_live_events(limit))
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/cases/{case_id}/respond", response_model=Dict)
-async def respond_to_case(
+def respond_to_case(
     case_id: str,
     request: RespondToCaseRequest,
     user_id: str = Header(alias="X-User-Id"),
 ) -> Dict:
     """Helper responds to a case to offer assistance."""
     try:
-        with psycopg.connect(SUPABASE_POSTGRES_URL) as conn:
+        with get_pool().connection() as conn:
             with conn.cursor() as cur:
                 # Add user as a candidate helper
                 cur.execute(
@@ -1381,54 +1496,51 @@ async def respond_to_case(
                 cur.execute(
                     """
                     UPDATE "case"
-                    SET status = 'In Progress', updated_at = %s
+                    SET status = 'In Progress', updated_at = now()
                     WHERE id = %s AND status = 'Open'
                     """,
-                    (datetime.utcnow(), case_id),
+                    (case_id,),
                 )
 
                 # Create an event log entry
-                event_id = str(uuid.uuid4())
                 cur.execute(
                     """
-                    INSERT INTO event (id, case_id, timestamp, description)
-                    VALUES (%s, %s, %s, %s)
+                    INSERT INTO event (case_id, description)
+                    VALUES (%s, %s)
                     """,
                     (
-                        event_id,
                         case_id,
-                        datetime.utcnow(),
                         f"Helper responded: {request.message}",
                     ),
                 )
 
                 conn.commit()
+                invalidate_reads()
                 return {"success": True, "message": "Successfully responded to case"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/cases/{case_id}/complete", response_model=CaseResponse)
-async def complete_case(case_id: str) -> CaseResponse:
+def complete_case(case_id: str) -> CaseResponse:
     """Mark a case as completed by setting completed_at and status to Resolved."""
     try:
-        now = datetime.utcnow()
-        with psycopg.connect(SUPABASE_POSTGRES_URL, row_factory=dict_row) as conn:
+        with get_pool().connection() as conn:
             with conn.cursor() as cur:
                 cur.execute(
                     """
                     UPDATE "case"
-                    SET completed_at = %s, status = 'Resolved', updated_at = %s
+                    SET completed_at = now(), status = 'Resolved', updated_at = now()
                     WHERE id = %s
                     RETURNING *
                     """,
-                    (now, now, case_id),
+                    (case_id,),
                 )
                 row = cur.fetchone()
                 if not row:
                     raise HTTPException(status_code=404, detail="Case not found")
-                row["id"] = str(row["id"])
                 conn.commit()
+        invalidate_reads()
         return CaseResponse(**row)
     except HTTPException:
         raise
@@ -1436,60 +1548,81 @@ async def complete_case(case_id: str) -> CaseResponse:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-# Debug endpoint to view all data
-@app.get("/debug/all")
-async def get_all_data() -> Dict:
-    """Get all cases, events, and messages for debugging."""
-    try:
-        with psycopg.connect(SUPABASE_POSTGRES_URL, row_factory=dict_row) as conn:
-            with conn.cursor() as cur:
-                # Get all cases
-                cur.execute('SELECT * FROM "case" ORDER BY created_at DESC')
-                cases = cur.fetchall()
+# Cases are read from a server-side cursor in batches of this many rows
+_DEBUG_ALL_BATCH_ROWS = 2000
+_DEBUG_ALL_FETCH_CASES = f"FETCH {_DEBUG_ALL_BATCH_ROWS} FROM debug_all_cases"
 
-                # Convert UUIDs to strings in cases
-                for case in cases:
-                    case["id"] = str(case["id"])
 
-                # Get all events including coordinates and maps URL
-                cur.execute(
-                    "SELECT id, case_id, timestamp, description, latitude, longitude, maps_url, text_message_id FROM event ORDER BY timestamp DESC LIMIT 50"
-                )
-                events = cur.fetchall()
+def _all_data_chunks() -> Iterator[bytes]:
+    """
+    /debug/all body as JSON chunks. The events, messages and stats come first; cases then stream
+    from a server-side cursor, so the table is never held in memory as a whole. orjson encodes
+    the UUID and datetime values as-is.
+    """
+    with get_pool().connection() as conn:
+        # Pipeline mode: the three small SELECTs, the case cursor's DECLARE and its first batch all
+        # go out at once and complete in one round-trip. psycopg's named cursors cannot run in a
+        # pipeline, so the cursor is declared and fetched with plain statements (never prepared).
+        with conn.pipeline(), conn.cursor() as stats_cur, conn.cursor() as events_cur, conn.cursor() as messages_cur, conn.cursor() as cases_cur:
+            stats_cur.execute(
+                """
+                SELECT COUNT(*) AS total_cases, COUNT(*) FILTER (WHERE status = 'Open') AS open_cases
+                FROM "case"
+                """
+            )
+            # Get all events including coordinates and maps URL
+            events_cur.execute(
+                "SELECT id, case_id, timestamp, description, latitude, longitude, maps_url, text_message_id FROM event ORDER BY timestamp DESC LIMIT 50"
+            )
+            # Get all text messages with coordinates and maps URL
+            messages_cur.execute(
+                "SELECT id, source, target, raw_text, user_id, latitude, longitude, maps_url, created_at FROM text_message ORDER BY created_at DESC LIMIT 50"
+            )
+            # Closed when the pool commits the transaction
+            conn.execute(
+                'DECLARE debug_all_cases NO SCROLL CURSOR FOR SELECT * FROM "case" ORDER BY created_at DESC',
+                prepare=False,
+            )
+            cases_cur.execute(_DEBUG_ALL_FETCH_CASES, prepare=False)
+            counts = stats_cur.fetchone()
+            events = events_cur.fetchall()
+            messages = messages_cur.fetchall()
+            rows = cases_cur.fetchall()
+
+        stats = {
+            "total_cases": counts["total_cases"],
+            "open_cases": counts["open_cases"],
+            "total_events": len(events),
+            "total_messages": len(messages),
+        }
+        yield b"".join([
+            b'{"events":', orjson.dumps(events),
+            b',"text_messages":', orjson.dumps(messages),
+            b',"stats":', orjson.dumps(stats),
+            b',"cases":[',
+        ])
+
+        separator = b""
+        while rows:
+            yield separator + b",".join([orjson.dumps(row) for row in rows])
+            separator = b","
+            if len(rows) < _DEBUG_ALL_BATCH_ROWS:
+                break
+            rows = conn.execute(_DEBUG_ALL_FETCH_CASES, prepare=False).fetchall()
+    yield b"]}"
 
-                # Convert UUIDs to strings in events
-                for event in events:
-                    event["id"] = str(event["id"])
-                    if event.get("case_id"):
-                        event["case_id"] = str(event["case_id"])
-                    if event.get("text_message_id"):
-                        event["text_message_id"] = str(event["text_message_id"])
 
-                # Get all text messages with coordinates and maps URL
-                cur.execute(
-                    "SELECT id, source, target, raw_text, user_id, latitude, longitude, maps_url, created_at FROM text_message ORDER BY created_at DESC LIMIT 50"
-                )
-                messages = cur.fetchall()
-
-                # Convert UUIDs to strings in messages
-                for msg in messages:
-                    msg["id"] = str(msg["id"])
-                    if msg.get("user_id"):
-                        msg["user_id"] = str(msg["user_id"])
-
-                return {
-                    "cases": cases,
-                    "events": events,
-                    "text_messages": messages,
-                    "stats": {
-                        "total_cases": len(cases),
-                        "open_cases": len([c for c in cases if c["status"] == "Open"]),
-                        "total_events": len(events),
-                        "total_messages": len(messages),
-                    },
-                }
+# Debug endpoint to view all data
+@app.get("/debug/all", response_model=Dict)
+def get_all_data() -> Response:
+    """Get all cases, events, and messages for debugging."""
+    chunks = _all_data_chunks()
+    try:
+        # The small queries run before the response starts, so their failures are still a 500
+        first = next(chunks)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return StreamingResponse(itertools.chain((first,), chunks), media_type="application/json")
 
 
 # AI Chat Endpoint
@@ -1497,22 +1630,20 @@ async def get_all_data() -> Dict:
 async def chat_with_agent(request: ChatRequest) -> ChatResponse:
     """Chat with the emergency response AI agent."""
     try:
-        # Initialize the agent
-        agent = EmergencyAgent(SUPABASE_POSTGRES_URL)
-
         # Process the message
         conversation_history = [
             {"role": msg.role, "content": msg.content}
             for msg in request.conversation_history
         ]
-        user_id = request.user_id or str(uuid.uuid4())
+        # Without a user id, Postgres assigns the new user's id if a case is created
+        user_id = request.user_id
 
-        response_text, case_id, info = agent.process_message(
+        response_text, case_id, info = await _emergency_agent.process_message(
             request.message, conversation_history, user_id, SUPABASE_POSTGRES_URL
         )
 
         # Convert info to dict if it exists
-        extracted_info = info.dict() if info else None
+        extracted_info = info.model_dump() if info else None
 
         return ChatResponse(
             response=response_text, case_id=case_id, extracted_info=extracted_info
@@ -1522,9 +1653,45 @@ async def chat_with_agent(request: ChatRequest) -> ChatResponse:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post(
+    "/chat/stream",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def chat_with_agent_stream(request: ChatRequest) -> StreamingResponse:
+    """
+    Chat with the emergency response AI agent over Server-Sent Events.
+    Emits `delta` events with reply text as it is generated, then a `done` event carrying
+    any case confirmation text, case_id and extracted_info (an `error` event on failure).
+    """
+    conversation_history = [
+        {"role": msg.role, "content": msg.content}
+        for msg in request.conversation_history
+    ]
+    # Without a user id, Postgres assigns the new user's id if a case is created
+    user_id = request.user_id
+
+    async def _events():
+        try:
+            async for event in _emergency_agent.stream_message(
+                request.message, conversation_history, user_id, SUPABASE_POSTGRES_URL
+            ):
+                yield f"event: {event['type']}\ndata: {orjson.dumps(event).decode()}\n\n"
+        except Exception as e:
+            webhook_logger.exception("chat_stream_error user_id=%s", user_id)
+            yield f"event: error\ndata: {orjson.dumps({'type': 'error', 'detail': str(e)}).decode()}\n\n"
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        # Stop proxies from buffering the stream, which would defeat the point of SSE
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # Resource Endpoints
 @app.get("/resources", response_model=List[ResourceResponse])
-async def get_resources(
+def get_resources(
     resource_type: Optional[str] = Query(
         None, description="Filter by type (hospital, shelter, supply, etc.)"
     ),
@@ -1539,7 +1706,7 @@ async def get_resources(
 ) -> List[ResourceResponse]:
     """Get resources, optionally filtered by type, status, and proximity."""
     try:
-        with psycopg.connect(SUPABASE_POSTGRES_URL, row_factory=dict_row) as conn:
+        with get_pool().connection() as conn:
             with conn.cursor() as cur:
                 # Build query based on filters
                 query = """
@@ -1548,12 +1715,13 @@ async def get_resources(
                         latitude, longitude, maps_url,
                         capacity, status
                 """
+                params: list = []
+                near = lat is not None and lng is not None
 
-                # Add distance calculation if coordinates provided
-                if lat is not None and lng is not None:
-                    query += f""",
-                        SQRT(POWER(latitude - {lat}, 2) + POWER(longitude - {lng}, 2)) * 111 as distance_km
-                    """
+                # Add distance calculation if coordinates provided (degrees -> ~km)
+                if near:
+                    query += ", (coords <-> point(%s, %s)) * 111 as distance_km"
+                    params += [lat, lng]
                 else:
                     query += ", NULL as distance_km"
 
@@ -1561,35 +1729,35 @@ async def get_resources(
 
                 # Add type filter
                 if resource_type:
-                    query += f" AND LOWER(name) LIKE '%{resource_type.lower()}%'"
+                    query += " AND name ILIKE %s"
+                    params.append(f"%{resource_type}%")
 
                 if status:
-                    query += f" AND status = '{status}'"
-
-                # Add distance filter if specified
-                if lat is not None and lng is not None and max_distance_km:
-                    query += f" AND SQRT(POWER(latitude - {lat}, 2) + POWER(longitude - {lng}, 2)) * 111 <= {max_distance_km}"
-
-                # Order by distance if coordinates provided, otherwise by name
-                if lat is not None and lng is not None:
-                    query += " ORDER BY distance_km NULLS LAST, name"
+                    query += " AND status = %s"
+                    params.append(status)
+
+                # Add distance filter if specified (GiST-indexed containment in a circle)
+                if near and max_distance_km:
+                    query += " AND coords <@ circle(point(%s, %s), %s)"
+                    params += [lat, lng, max_distance_km / 111]
+
+                # Order by distance if coordinates provided (index-ordered k-NN), otherwise by name
+                if near:
+                    query += " ORDER BY coords <-> point(%s, %s), name"
+                    params += [lat, lng]
                 else:
                     query += " ORDER BY name"
 
-                cur.execute(query)
+                cur.execute(query, params, prepare=PREPARE_HOT)
                 results = cur.fetchall()
 
-                # Convert UUIDs to strings
-                for r in results:
-                    r["id"] = str(r["id"])
-
                 return [ResourceResponse(**r) for r in results]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/resources/nearest", response_model=Optional[ResourceResponse])
-async def get_nearest_resource(
+def get_nearest_resource(
     lat: float = Query(..., description="Latitude of emergency"),
     lng: float = Query(..., description="Longitude of emergency"),
     resource_type: Optional[str] = Query(
@@ -1598,14 +1766,14 @@ async def get_nearest_resource(
 ) -> Optional[ResourceResponse]:
     """Find the nearest resource to an emergency location."""
     try:
-        with psycopg.connect(SUPABASE_POSTGRES_URL, row_factory=dict_row) as conn:
+        with get_pool().connection() as conn:
             with conn.cursor() as cur:
                 query = """
                     SELECT
                         id, name, description, location,
                         latitude, longitude, maps_url,
                         capacity, status,
-                        SQRT(POWER(latitude - %s, 2) + POWER(longitude - %s, 2)) * 111 as distance_km
+                        (coords <-> point(%s, %s)) * 111 as distance_km
                     FROM resource
                     WHERE status = 'Available'
                 """
@@ -1613,15 +1781,18 @@ async def get_nearest_resource(
                 params = [lat, lng]
 
                 if resource_type:
-                    query += f" AND LOWER(name) LIKE '%%{resource_type.lower()}%%'"
+                    query += " AND name ILIKE %s"
+                    params.append(f"%{resource_type}%")
 
-                query += " ORDER BY distance_km NULLS LAST LIMIT 1"
+                # Ordering by the <-> expression itself lets the GiST index return the nearest row
+                # first; rows without coordinates have a NULL point and sort last
+                query += " ORDER BY coords <-> point(%s, %s) LIMIT 1"
+                params += [lat, lng]
 
-                cur.execute(query, params)
+                cur.execute(query, params, prepare=PREPARE_HOT)
                 result = cur.fetchone()
 
                 if result:
-                    result["id"] = str(result["id"])
                     return ResourceResponse(**result)
 
                 return None
@@ -0,0 +1,35 @@
+"""Shared OpenAI client: embeddings and Whisper calls reuse one keep-alive connection pool."""
+
+import threading
+
+import httpx
+from openai import OpenAI
+
+from env import OPENAI_API_KEY
+
+_client: OpenAI | None = None
+_client_lock = threading.Lock()
+
+
+def get_openai_client() -> OpenAI:
+    """Process-wide OpenAI client, built on first use so importing never needs the key."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = OpenAI(
+                    api_key=OPENAI_API_KEY,
+                    http_client=httpx.Client(
+                        timeout=httpx.Timeout(30.0, connect=5.0),
+                        limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+                    ),
+                )
+    return _client
+
+
+def close_openai_client() -> None:
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
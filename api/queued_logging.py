@@ -0,0 +1,39 @@
+"""Move a logger's handlers onto a listener thread so request paths only enqueue records."""
+
+import logging
+import logging.handlers
+import queue
+from typing import Tuple
+
+
+def handler_owner(logger: logging.Logger) -> logging.Logger:
+    """
+    The logger whose handlers actually emit this logger's records. uvicorn.error has none of its
+    own under uvicorn's default config: its records propagate to the "uvicorn" logger's handler.
+    """
+    current = logger
+    while current is not None:
+        if current.handlers or not current.propagate:
+            return current
+        current = current.parent
+    return logger
+
+
+def start_queued_logging(
+    logger: logging.Logger,
+) -> Tuple[logging.Logger, logging.handlers.QueueListener]:
+    """Queue the handlers of the logger that owns `logger`'s output; returns that owner and the listener."""
+    owner = handler_owner(logger)
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(
+        log_queue, *owner.handlers, respect_handler_level=True
+    )
+    owner.handlers = [logging.handlers.QueueHandler(log_queue)]
+    listener.start()
+    return owner, listener
+
+
+def stop_queued_logging(owner: logging.Logger, listener: logging.handlers.QueueListener) -> None:
+    """Flush queued records, then put the owner's original handlers back."""
+    listener.stop()
+    owner.handlers = list(listener.handlers)
@@ -3,14 +3,17 @@ Responder notification system for alerting nearby helpers in emergencies.
 """
 
 import math
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Tuple, Optional
-import psycopg
-from psycopg.rows import dict_row
+from db import get_pool
 from twilio_app import send_sms
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on concurrent Twilio sends when alerting responders
+MAX_PARALLEL_ALERTS = 10
+
 
 def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
@@ -46,7 +49,7 @@ def find_nearby_responders(
     Find active responders within a given radius of the emergency location.
 
     Args:
-        db_url: Database connection string
+        db_url: Database connection string (queries run on the shared pool for this database)
         latitude: Emergency location latitude
         longitude: Emergency location longitude
         radius_km: Search radius in kilometers (default 5km)
@@ -59,7 +62,7 @@ def find_nearby_responders(
     responders = []
 
     try:
-        with psycopg.connect(db_url, row_factory=dict_row) as conn:
+        with get_pool().connection() as conn:
             with conn.cursor() as cur:
                 # Base query for active responders with location
                 query = """
@@ -126,16 +129,89 @@ def find_nearby_responders(
                 responders = responders[:limit]
 
     except Exception as e:
-        logger.error(f"Error finding nearby responders: {e}")
+        logger.error("find_nearby_responders_error error=%s", e)
 
     return responders
 
 
+def _build_alert_message(responder: Dict, emergency_info: Dict, case_id: Optional[str]) -> str:
+    """Compose the alert SMS for one responder."""
+    message = f"🚨 EMERGENCY ALERT\n\n"
+    message += f"Your help is needed {responder['distance_km']}km away!\n\n"
+
+    if emergency_info.get("emergency_description"):
+        message += (
+            f"Situation: {emergency_info['emergency_description'][:100]}\n"
+        )
+
+    if emergency_info.get("location"):
+        message += f"Location: {emergency_info['location']}\n"
+
+    if emergency_info.get("latitude") and emergency_info.get("longitude"):
+        maps_url = f"https://www.google.com/maps?q={emergency_info['latitude']},{emergency_info['longitude']}"
+        message += f"Maps: {maps_url}\n"
+
+    if emergency_info.get("category"):
+        message += f"Type: {emergency_info['category']}\n"
+
+    if emergency_info.get("severity"):
+        message += f"Severity: {emergency_info['severity']}/5\n"
+
+    if case_id:
+        message += f"\nCase ID: {str(case_id)[:8]}\n"
+
+    message += "\nReply YES if you can respond."
+    return message
+
+
+def _send_alert(responder: Dict, emergency_info: Dict, case_id: Optional[str]) -> bool:
+    """Text one responder; True if Twilio accepted the message."""
+    try:
+        message = _build_alert_message(responder, emergency_info, case_id)
+        logger.debug("responder_alert_send phone=%s length=%s", responder["phone"], len(message))
+
+        result = send_sms(responder["phone"], message)
+
+        logger.debug(
+            "responder_alert_result status=%s sid=%s error=%s",
+            result.status, result.message_sid, result.error_message,
+        )
+
+        if result.status:
+            logger.info("responder_notified name=%s phone=%s", responder["name"], responder["phone"])
+            return True
+        logger.error("responder_notify_failed name=%s error=%s", responder["name"], result.error_message)
+    except Exception:
+        logger.exception("responder_notify_error name=%s", responder["name"])
+    return False
+
+
+def _track_assignments(case_id: str, responders: List[Dict]) -> None:
+    """Record the notified responders against the case, in one pooled connection and batch."""
+    try:
+        with get_pool().connection() as conn:
+            with conn.cursor() as cur:
+                cur.executemany(
+                    """
+                    INSERT INTO responder_assignment
+                    (case_id, responder_id, status, distance_km, notified_at)
+                    VALUES (%s, %s, 'notified', %s, now())
+                    ON CONFLICT (case_id, responder_id) DO UPDATE
+                    SET status = 'notified', notified_at = now()
+                    """,
+                    [(case_id, r["id"], r.get("distance_km")) for r in responders],
+                )
+        logger.info("responder_assignments_tracked count=%s case_id=%s", len(responders), case_id)
+    except Exception as e:
+        logger.error("responder_assignments_track_error case_id=%s error=%s", case_id, e)
+
+
 def notify_responders(
     responders: List[Dict], emergency_info: Dict, case_id: Optional[str] = None, db_url: Optional[str] = None
 ) -> Tuple[int, int]:
     """
     Send SMS notifications to responders about an emergency.
+    The Twilio sends run in parallel, so alerting N responders takes about one send's latency.
 
     Args:
         responders: List of responder dictionaries with phone numbers
@@ -145,101 +221,26 @@ def notify_responders(
     Returns:
         Tuple of (successful_notifications, failed_notifications)
     """
-    logger.info(f"DEBUG notify_responders: Called with {len(responders)} responders, case_id={case_id}")
-    logger.info(f"DEBUG notify_responders: Responders list: {responders}")
-
-    successful = 0
-    failed = 0
+    logger.debug("notify_responders count=%s case_id=%s responders=%s", len(responders), case_id, responders)
 
     if not responders:
-        logger.warning("DEBUG notify_responders: Empty responders list, returning early")
+        logger.debug("notify_responders_skipped reason=no_responders case_id=%s", case_id)
         return 0, 0
 
-    for idx, responder in enumerate(responders):
-        try:
-            logger.info(f"DEBUG: Processing responder {idx+1}/{len(responders)}: {responder['name']} at {responder['phone']}")
-
-            # Construct the SMS message
-            message = f"🚨 EMERGENCY ALERT\n\n"
-            message += f"Your help is needed {responder['distance_km']}km away!\n\n"
-
-            if emergency_info.get("emergency_description"):
-                message += (
-                    f"Situation: {emergency_info['emergency_description'][:100]}\n"
-                )
-
-            if emergency_info.get("location"):
-                message += f"Location: {emergency_info['location']}\n"
-
-            if emergency_info.get("latitude") and emergency_info.get("longitude"):
-                maps_url = f"https://www.google.com/maps?q={emergency_info['latitude']},{emergency_info['longitude']}"
-                message += f"Maps: {maps_url}\n"
-
-            if emergency_info.get("category"):
-                message += f"Type: {emergency_info['category']}\n"
-
-            if emergency_info.get("severity"):
-                message += f"Severity: {emergency_info['severity']}/5\n"
-
-            if case_id:
-                message += f"\nCase ID: {str(case_id)[:8]}\n"
-
-            message += "\nReply YES if you can respond."
-
-            logger.info(f"DEBUG: Sending SMS to {responder['phone']}, message length: {len(message)}")
-
-            # Send the SMS
-            result = send_sms(responder["phone"], message)
-
-            logger.info(f"DEBUG: SMS result - status: {result.status}, sid: {result.message_sid}, error: {result.error_message}")
-
-            if result.status:
-                successful += 1
-                logger.info(
-                    f"Notified responder {responder['name']} at {responder['phone']}"
-                )
+    with ThreadPoolExecutor(max_workers=min(len(responders), MAX_PARALLEL_ALERTS)) as executor:
+        sent = list(
+            executor.map(lambda r: _send_alert(r, emergency_info, case_id), responders)
+        )
 
-                # Track assignment in database if case_id and db_url provided
-                if case_id and db_url:
-                    try:
-                        import uuid
-                        from datetime import datetime
-                        with psycopg.connect(db_url, row_factory=dict_row) as conn:
-                            with conn.cursor() as cur:
-                                cur.execute(
-                                    """
-                                    INSERT INTO responder_assignment
-                                    (case_id, responder_id, status, distance_km, notified_at)
-                                    VALUES (%s, %s, %s, %s, %s)
-                                    ON CONFLICT (case_id, responder_id) DO UPDATE
-                                    SET status = 'notified', notified_at = %s
-                                    """,
-                                    (
-                                        case_id,
-                                        responder["id"],
-                                        "notified",
-                                        responder.get("distance_km"),
-                                        datetime.now(),
-                                        datetime.now()
-                                    )
-                                )
-                                conn.commit()
-                                logger.info(f"Tracked assignment for responder {responder['id']} to case {case_id}")
-                    except Exception as e:
-                        logger.error(f"Failed to track assignment: {e}")
-            else:
-                failed += 1
-                logger.error(
-                    f"Failed to notify {responder['name']}: {result.error_message}"
-                )
+    notified = [r for r, ok in zip(responders, sent) if ok]
+    successful = len(notified)
+    failed = len(responders) - successful
 
-        except Exception as e:
-            failed += 1
-            logger.error(f"Error notifying responder {responder['name']}: {e}")
-            import traceback
-            logger.error(f"Full traceback: {traceback.format_exc()}")
+    # Track assignments in database if case_id and db_url provided
+    if notified and case_id and db_url:
+        _track_assignments(case_id, notified)
 
-    logger.info(f"DEBUG notify_responders: Completed - successful={successful}, failed={failed}")
+    logger.debug("notify_responders_done successful=%s failed=%s", successful, failed)
     return successful, failed
 
 
@@ -277,19 +278,21 @@ def alert_nearby_help(
         )
         return result
 
-    print(f"DEBUG alert_nearby_help: Starting search at {emergency_info['latitude']}, {emergency_info['longitude']}")
+    logger.debug(
+        "alert_nearby_help_start lat=%s lng=%s", emergency_info["latitude"], emergency_info["longitude"]
+    )
 
     # Determine needed specialties based on emergency category
     category = emergency_info.get("category", "").lower()
     emergency_desc = emergency_info.get("emergency_description", "").lower()
     needed_specialties = None
 
-    print(f"DEBUG: Category={category}, Description={emergency_desc[:50] if emergency_desc else 'None'}")
+    logger.debug("alert_nearby_help_category category=%s description=%r", category, emergency_desc[:50])
 
     # Check for allergy/epipen emergency first
     if any(word in emergency_desc for word in ["allerg", "anaphyl", "epipen", "bee sting", "peanut", "shellfish", "nuts", "reaction"]):
         needed_specialties = ["EPIPEN_HOLDER", "Doctor", "EMT"]
-        print(f"DEBUG: Detected allergy emergency! Looking for: {needed_specialties}")
+        logger.debug("alert_nearby_help_allergy specialties=%s", needed_specialties)
     elif "medical" in category or "injury" in category or "health" in category:
         needed_specialties = ["Doctor", "Nurse", "EMT"]
     elif "fire" in category:
@@ -302,7 +305,7 @@ def alert_nearby_help(
         needed_specialties = ["Search & Rescue", "Firefighter"]
 
     # Find nearby responders - DEMO MODE: very loose filters
-    print(f"DEBUG: Searching for responders within {radius_km}km, specialties={needed_specialties}")
+    logger.debug("alert_nearby_help_search radius_km=%s specialties=%s", radius_km, needed_specialties)
 
     # For demo: use VERY large radius to ensure we find everyone
     demo_radius = 1000.0  # 1000km radius - covers all of Scandinavia!
@@ -317,9 +320,11 @@ def alert_nearby_help(
         only_real_numbers=False,  # DEMO: Allow all numbers including test numbers
     )
 
-    print(f"DEBUG: Found {len(responders)} responders")
-    for r in responders:
-        print(f"  - {r.get('name', 'Unknown')}: {r.get('distance_km', 'Unknown')}km, phone={r.get('phone', 'Unknown')}")
+    logger.debug(
+        "alert_nearby_help_found count=%s responders=%s",
+        len(responders),
+        [(r.get("name"), r.get("distance_km"), r.get("phone")) for r in responders],
+    )
 
     result["responders_found"] = len(responders)
     result["responders"] = [
@@ -333,14 +338,12 @@ def alert_nearby_help(
 
     # Send notifications if responders found
     if responders:
-        logger.info(f"DEBUG alert_nearby_help: About to call notify_responders with {len(responders)} responders")
         successful, failed = notify_responders(responders, emergency_info, case_id, db_url)
-        logger.info(f"DEBUG alert_nearby_help: notify_responders returned - successful={successful}, failed={failed}")
         result["notifications_sent"] = successful
         result["notifications_failed"] = failed
 
-        logger.info(f"Alerted {successful} responders, {failed} failed")
+        logger.info("responders_alerted successful=%s failed=%s case_id=%s", successful, failed, case_id)
     else:
-        logger.warning("DEBUG alert_nearby_help: No responders found, skipping notifications")
+        logger.warning("alert_nearby_help_no_responders case_id=%s", case_id)
 
     return result
@@ -6,7 +6,6 @@ import uuid
 import psycopg
 from psycopg.rows import dict_row
 from geopy.geocoders import GoogleV3
-from datetime import datetime
 import os
 import sys
 sys.path.append(os.path.dirname(__file__))
@@ -189,9 +188,9 @@ def main():
                         """
                         INSERT INTO resource (
                             id, name, description, location,
-                            latitude, longitude, capacity, status, created_at
+                            latitude, longitude, capacity, status
                         )
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
                         RETURNING id, maps_url
                         """,
                         (
@@ -203,7 +202,6 @@ def main():
                             lng,
                             resource.get('capacity'),
                             resource.get('status', 'Available'),
-                            datetime.utcnow()
                         )
                     )
 
@@ -222,10 +220,10 @@ def main():
 
                     cur.execute(
                         """
-                        INSERT INTO event (id, timestamp, description, latitude, longitude)
-                        VALUES (%s, %s, %s, %s, %s)
+                        INSERT INTO event (id, description, latitude, longitude)
+                        VALUES (%s, %s, %s, %s)
                         """,
-                        (event_id, datetime.utcnow(), event_desc, lat, lng)
+                        (event_id, event_desc, lat, lng)
                     )
 
                     added_count += 1
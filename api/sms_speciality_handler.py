@@ -9,7 +9,6 @@ from psycopg.rows import dict_row
 from fastapi.responses import Response
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage
-from geopy.geocoders import GoogleV3
 from geopy.exc import GeocoderTimedOut, GeocoderServiceError
 
 from env import (
@@ -18,23 +17,15 @@ from env import (
     OPENAI_API_KEY,
     SUPABASE_POSTGRES_URL,
 )
-from twilio_app import send_sms
+from geocoding import geocode
+from openai_client import get_openai_client
+from twilio_app import send_sms, truncate_sms_body
 
 logger = logging.getLogger("uvicorn.error")
 
 # Twilio number for this handler (replies sent from this number when using from_number=)
 TWILIO_SPECIALITY_NUMBER = "+46764790083"
 
-# Twilio SMS body limit (concatenated message)
-SMS_BODY_MAX_LEN = 1600
-
-
-def _truncate_sms_body(text: str) -> str:
-    """Truncate to Twilio 1600 char limit."""
-    if len(text) <= SMS_BODY_MAX_LEN:
-        return text
-    return text[: SMS_BODY_MAX_LEN - 3] + "..."
-
 SUCCESS_RESPONSE = Response(
     content='<?xml version="1.0" encoding="UTF-8"?><Response></Response>',
     media_type="application/xml",
@@ -178,10 +169,7 @@ def _geocode_location(location_text: str) -> tuple[float | None, float | None]:
     if not location_text or not GOOGLE_MAPS_API_KEY:
         return None, None
     try:
-        geocoder = GoogleV3(api_key=GOOGLE_MAPS_API_KEY)
-        result = geocoder.geocode(location_text.strip())
-        if result:
-            return result.latitude, result.longitude
+        return geocode(location_text.strip())
     except (GeocoderTimedOut, GeocoderServiceError) as e:
         logger.warning("speciality_geocode_error location=%s error=%s", location_text[:80], e)
     except Exception as e:
@@ -194,9 +182,7 @@ def _embed_texts(texts: list[str]) -> list[list[float]]:
     if not OPENAI_API_KEY or not texts:
         return []
     try:
-        from openai import OpenAI
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        response = client.embeddings.create(
+        response = get_openai_client().embeddings.create(
             input=texts,
             model="text-embedding-3-small",
         )
@@ -342,12 +328,12 @@ def handle_sms_speciality_number(
     all_messages = historic + [body]
     parsed, follow_up = _parse_speciality_with_llm(all_messages)
     if follow_up:
-        send_sms(from_number, _truncate_sms_body(follow_up), from_number=TWILIO_SPECIALITY_NUMBER)
+        send_sms(from_number, truncate_sms_body(follow_up), from_number=TWILIO_SPECIALITY_NUMBER)
         return SUCCESS_RESPONSE
 
     # Parsed case: geocode location, embed each skill, persist user + ethan_user_speciality, then send confirmation
     lat, lng = _geocode_location(parsed["location"])
     skill_embeddings = _embed_texts(parsed["skills"])
     _persist_parsed_speciality(from_number, parsed, lat, lng, skill_embeddings)
-    send_sms(from_number, _truncate_sms_body(parsed["confirmation_message"]), from_number=TWILIO_SPECIALITY_NUMBER)
+    send_sms(from_number, truncate_sms_body(parsed["confirmation_message"]), from_number=TWILIO_SPECIALITY_NUMBER)
     return SUCCESS_RESPONSE
\ No newline at end of file
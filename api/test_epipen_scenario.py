@@ -4,6 +4,7 @@ Test script specifically for the EpiPen allergy scenario.
 This simulates an allergic reaction emergency and shows how the system responds.
 """
 
+import asyncio
 import json
 import requests
 from responder_notifier import find_nearby_responders, alert_nearby_help
@@ -84,7 +85,7 @@ def test_agent_allergy_response():
 
         # Extract emergency info
         conversation = [{"role": "user", "content": message}]
-        info = agent.extract_info_from_conversation(conversation)
+        info = asyncio.run(agent.extract_info_from_conversation(conversation))
 
         print(f"   Category: {info.category}")
         print(f"   Severity: {info.severity}/5")
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test the extraction gate: which turns run the extraction LLM call. Runs standalone (no .env or
+API keys needed): python api/test_extraction_gate.py
+"""
+
+from extraction_gate import EXTRACT_EVERY_N_USER_TURNS, should_extract
+
+
+def _user(*texts):
+    conversation = []
+    for text in texts:
+        conversation.append({"role": "user", "content": text})
+        conversation.append({"role": "assistant", "content": "Can you tell me more?"})
+    return conversation[:-1]
+
+
+def test_digit_ids_trigger_extraction():
+    assert should_extract(_user("I'm Anna, 19900101-1234, stuck at Abisko"))
+    assert should_extract(_user("SSN 123-45-6789"))
+    # 8 digits: shorter than a personnummer, still worth a call
+    assert should_extract(_user("my number is 12345678"))
+    # Letters mixed in
+    assert should_extract(_user("passport AB1234567"))
+
+
+def test_id_keyword_triggers_extraction_without_digits():
+    assert should_extract(_user("my personnummer is nineteen ninety, zero one, zero one"))
+    assert should_extract(_user("I can give you my social security number"))
+
+
+def test_small_talk_skips_extraction():
+    assert not should_extract(_user("help"))
+    assert not should_extract(_user("help", "my car broke down"))
+    assert not should_extract([])
+
+
+def test_unrecognised_id_still_extracted_every_n_turns():
+    turns = ["help", "I'm in the mountains"] + ["it is one nine nine zero"]
+    assert len(turns) == EXTRACT_EVERY_N_USER_TURNS
+    assert should_extract(_user(*turns))
+    assert not should_extract(_user(*turns, "what now?"))
+
+
+def test_assistant_turns_do_not_count():
+    conversation = [
+        {"role": "assistant", "content": "Please give your ID, e.g. 19900101-1234"},
+        {"role": "user", "content": "ok"},
+    ]
+    assert not should_extract(conversation)
+
+
+if __name__ == "__main__":
+    test_digit_ids_trigger_extraction()
+    test_id_keyword_triggers_extraction_without_digits()
+    test_small_talk_skips_extraction()
+    test_unrecognised_id_still_extracted_every_n_turns()
+    test_assistant_turns_do_not_count()
+    print("extraction gate tests passed")
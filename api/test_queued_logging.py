@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test queued logging: the handlers that really emit uvicorn.error records are queued, and records
+still reach them. Runs standalone (no .env or database needed): python api/test_queued_logging.py
+"""
+
+import logging
+import logging.handlers
+
+from queued_logging import handler_owner, start_queued_logging, stop_queued_logging
+
+
+class _Collect(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def _uvicorn_default_loggers():
+    """uvicorn's default LOGGING_CONFIG shape: the handler sits on "uvicorn", uvicorn.error propagates to it"""
+    parent = logging.getLogger("test_uvicorn")
+    child = logging.getLogger("test_uvicorn.error")
+    original = _Collect()
+    parent.handlers = [original]
+    parent.setLevel(logging.INFO)
+    parent.propagate = False
+    child.handlers = []
+    child.propagate = True
+    return parent, child, original
+
+
+def test_queues_the_owning_loggers_handlers():
+    parent, child, original = _uvicorn_default_loggers()
+    assert handler_owner(child) is parent
+
+    owner, listener = start_queued_logging(child)
+    try:
+        assert owner is parent
+        assert parent.handlers and all(
+            isinstance(h, logging.handlers.QueueHandler) for h in parent.handlers
+        )
+        assert child.handlers == []
+        child.info("queued_record value=%s", 42)
+    finally:
+        stop_queued_logging(owner, listener)
+
+    # stop() flushes the queue, so the record has reached the original handler
+    assert original.messages == ["queued_record value=42"]
+    assert parent.handlers == [original]
+
+
+def test_logger_with_own_handlers_is_its_own_owner():
+    logger = logging.getLogger("test_own_handlers")
+    own = _Collect()
+    logger.handlers = [own]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    owner, listener = start_queued_logging(logger)
+    try:
+        assert owner is logger
+        logger.info("direct_record")
+    finally:
+        stop_queued_logging(owner, listener)
+    assert own.messages == ["direct_record"]
+
+
+if __name__ == "__main__":
+    test_queues_the_owning_loggers_handlers()
+    test_logger_with_own_handlers_is_its_own_owner()
+    print("queued logging tests passed")
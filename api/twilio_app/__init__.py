@@ -1,6 +1,13 @@
 """Twilio integration: SMS send, voice webhooks, Media Stream WebSocket, TwiML."""
 
-from twilio_app.sms import TwilioConfigError, send_sms, validate_twilio_signature, get_twilio_client
+from twilio_app.sms import (
+    SMS_BODY_MAX_LEN,
+    TwilioConfigError,
+    get_twilio_client,
+    send_sms,
+    truncate_sms_body,
+    validate_twilio_signature,
+)
 from twilio_app.twiml import build_connect_stream_twiml, build_say_hangup_twiml
 from twilio_app.voice_ws import handle_voice_media_stream
 from twilio_app.realtime_bridge import handle_realtime_voice_stream
@@ -9,6 +16,8 @@ from twilio_app.elevenlabs_bridge import handle_elevenlabs_voice_stream
 __all__ = [
     "TwilioConfigError",
     "send_sms",
+    "SMS_BODY_MAX_LEN",
+    "truncate_sms_body",
     "validate_twilio_signature",
     "get_twilio_client",
     "build_connect_stream_twiml",
@@ -16,12 +16,12 @@ import time
 import uuid
 from typing import TYPE_CHECKING
 
-import psycopg
-from geopy.geocoders import GoogleV3
 from geopy.exc import GeocoderTimedOut, GeocoderServiceError
 
 import env
 from agent import EmergencyAgent, EmergencyInfo
+from db import get_pool
+from geocoding import geocode
 
 if TYPE_CHECKING:
     from fastapi import WebSocket
@@ -145,7 +145,7 @@ async def run_realtime_bridge(
     Connect to OpenAI Realtime, send session.update with instructions,
     then forward Twilio audio -> OpenAI and OpenAI response.audio.delta -> Twilio.
     """
-    api_key = getattr(env, "OPENAI_API_KEY", None) or ""
+    api_key = env.OPENAI_API_KEY or ""
     if not api_key:
         webhook_logger.warning("realtime_bridge OPENAI_API_KEY not set")
         return
@@ -265,10 +265,8 @@ async def run_realtime_bridge(
             if not location_text:
                 return None, None, None
             try:
-                geocoder = GoogleV3(api_key=env.GOOGLE_MAPS_API_KEY)
-                result = geocoder.geocode(location_text)
-                if result:
-                    lat, lng = result.latitude, result.longitude
+                lat, lng = geocode(location_text)
+                if lat is not None:
                     maps_url = f"https://www.google.com/maps?q={lat},{lng}"
                     webhook_logger.info(
                         "realtime_geocode stream_sid=%s location=%s lat=%s lng=%s",
@@ -298,7 +296,7 @@ async def run_realtime_bridge(
             info.longitude = lng
 
             emergency_agent = EmergencyAgent(env.SUPABASE_URL)
-            with psycopg.connect(env.SUPABASE_POSTGRES_URL) as conn:
+            with get_pool().connection() as conn:
                 user_id = str(uuid.uuid5(uuid.NAMESPACE_URL, f"voice-{call_sid}"))
                 case_id = emergency_agent.create_case(info, user_id, conn)
 
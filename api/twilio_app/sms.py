@@ -1,5 +1,6 @@
 """Twilio SMS: send messages, client, signature validation."""
 
+import logging
 from dataclasses import dataclass
 from typing import Mapping
 
@@ -9,6 +10,19 @@ from twilio.rest import Client
 
 from env import TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_FROM_NUMBER
 
+logger = logging.getLogger(__name__)
+
+
+# Twilio SMS body limit (concatenated message)
+SMS_BODY_MAX_LEN = 1600
+
+
+def truncate_sms_body(text: str) -> str:
+    """Truncate to Twilio 1600 char limit; text within the limit is returned as-is (no copy)."""
+    if len(text) <= SMS_BODY_MAX_LEN:
+        return text
+    return f"{text[: SMS_BODY_MAX_LEN - 3]}..."
+
 
 class TwilioConfigError(RuntimeError):
     """Raised when required Twilio environment variables are missing."""
@@ -51,9 +65,6 @@ def validate_twilio_signature(
 
 
 def send_sms(to_number: str, body: str, from_number: str | None = None) -> SentSmsResult:
-    import logging
-    logger = logging.getLogger(__name__)
-
     logger.info(f"DEBUG send_sms: Attempting to send SMS to {to_number}, body length: {len(body)}")
 
     client, f = get_twilio_client()
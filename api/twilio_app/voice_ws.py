@@ -12,11 +12,12 @@ from fastapi import WebSocket
 from starlette.websockets import WebSocketDisconnect
 
 import env
-from elevenlabs import text_to_speech as elevenlabs_tts
+from elevenlabs import PROMPTS as TTS_PROMPTS, prompt_audio, text_to_speech as elevenlabs_tts
 from voice_agent import VoiceAgent
 
-import psycopg
 from agent import EmergencyAgent
+from db import get_pool
+from openai_client import get_openai_client
 
 _voice_agent = VoiceAgent()
 
@@ -28,8 +29,7 @@ SILENCE_CHUNKS_FOR_LOG = 50
 MIN_CHUNKS_FOR_WHISPER = 25
 # Audio threshold: chunk is "silent" if RMS (linear PCM, 0–32767) is below this
 AUDIO_SILENCE_THRESHOLD = 200
-# Twilio outbound media: 20ms per chunk at 8kHz μ-law = 160 bytes
-OUTBOUND_CHUNK_BYTES = 160
+# Twilio outbound media: 20ms per chunk at 8kHz μ-law = 160 bytes (elevenlabs.FRAME_BYTES)
 
 # G.711 μ-law decode table (8-bit mulaw -> 16-bit linear)
 _MULAW_EXPAND_TABLE: list[int] = []
@@ -103,26 +103,18 @@ def _mulaw_payloads_to_wav(payloads_base64: list[str], sample_rate: int = 8000)
     return header + pcm
 
 
-async def _send_tts_to_call(websocket: WebSocket, stream_sid: str, text: str) -> None:
-    """Generate TTS for text via ElevenLabs and stream μ-law chunks back over the call."""
-    loop = asyncio.get_event_loop()
+async def _send_tts_to_call(
+    websocket: WebSocket, stream_sid: str, text: str, prompt_id: str | None = None
+) -> None:
+    """Generate TTS for text via ElevenLabs and stream μ-law frames back over the call as they arrive.
+    prompt_id names a fixed elevenlabs.PROMPTS phrase, whose audio is prebaked at startup."""
+    frames = prompt_audio(prompt_id) if prompt_id else elevenlabs_tts(text)
     try:
-        audio_bytes = await loop.run_in_executor(None, lambda: elevenlabs_tts(text))
-    except Exception:
-        webhook_logger.exception("voice_ws_tts_generate_error stream_sid=%s", stream_sid)
-        return
-    if not audio_bytes:
-        return
-    try:
-        for i in range(0, len(audio_bytes), OUTBOUND_CHUNK_BYTES):
-            chunk = audio_bytes[i : i + OUTBOUND_CHUNK_BYTES]
-            if not chunk:
-                break
-            payload_b64 = base64.b64encode(chunk).decode("ascii")
+        async for frame in frames:
             msg = {
                 "event": "media",
                 "streamSid": stream_sid,
-                "media": {"payload": payload_b64},
+                "media": {"payload": base64.b64encode(frame).decode("ascii")},
             }
             await websocket.send_json(msg)
             await asyncio.sleep(0.02)
@@ -136,9 +128,7 @@ async def _whisper_transcribe(wav_bytes: bytes) -> str | None:
         webhook_logger.warning("voice_ws_whisper_skip OPENAI_API_KEY not set")
         return None
     try:
-        from openai import OpenAI
-
-        client = OpenAI(api_key=env.OPENAI_API_KEY)
+        client = get_openai_client()
         file_like = io.BytesIO(wav_bytes)
         file_like.name = "audio.wav"
         resp = client.audio.transcriptions.create(model="whisper-1", file=file_like, response_format="text")
@@ -238,6 +228,7 @@ async def handle_voice_media_stream(websocket: WebSocket) -> None:
                                         transcript,
                                     )
                                     if transcript:
+                                        response_prompt_id = None
                                         loop = asyncio.get_event_loop()
                                         try:
                                             response_text, info, should_end_call = await loop.run_in_executor(
@@ -250,7 +241,8 @@ async def handle_voice_media_stream(websocket: WebSocket) -> None:
                                             webhook_logger.exception(
                                                 "voice_ws_agent_error stream_sid=%s", stream_sid
                                             )
-                                            response_text = "I'm sorry, I had a small problem. Please try again."
+                                            response_prompt_id = "agent_error"
+                                            response_text = TTS_PROMPTS[response_prompt_id]
                                             should_end_call = False
                                             info = None
                                         conversation_history.append({"role": "user", "content": transcript})
@@ -258,7 +250,7 @@ async def handle_voice_media_stream(websocket: WebSocket) -> None:
                                         if should_end_call and info and call_sid:
                                             try:
                                                 emergency_agent = EmergencyAgent(env.SUPABASE_URL)
-                                                with psycopg.connect(env.SUPABASE_POSTGRES_URL) as conn:
+                                                with get_pool().connection() as conn:
                                                     case_id = emergency_agent.create_case(
                                                         info, f"voice-{call_sid}", conn
                                                     )
@@ -275,12 +267,12 @@ async def handle_voice_media_stream(websocket: WebSocket) -> None:
                                         if response_text:
                                             if should_end_call:
                                                 await _send_tts_to_call(
-                                                    websocket, stream_sid, response_text
+                                                    websocket, stream_sid, response_text, response_prompt_id
                                                 )
                                                 break
                                             asyncio.create_task(
                                                 _send_tts_to_call(
-                                                    websocket, stream_sid, response_text
+                                                    websocket, stream_sid, response_text, response_prompt_id
                                                 )
                                             )
                                 else:
@@ -8,11 +8,11 @@ import logging
 import time
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
-from geopy.geocoders import GoogleV3
 from geopy.exc import GeocoderTimedOut, GeocoderServiceError
 
-from env import GOOGLE_API_KEY, GOOGLE_MAPS_API_KEY
+from env import GOOGLE_API_KEY
 from agent import EmergencyInfo
+from geocoding import geocode
 
 logger = logging.getLogger("uvicorn.error")
 
@@ -49,21 +49,20 @@ class VoiceAgent:
             timeout=60,
             max_retries=2,
         )
-        self.geocoder = GoogleV3(api_key=GOOGLE_MAPS_API_KEY)
 
     def _geocode(self, location_text: str) -> tuple[float | None, float | None]:
         if not location_text:
             return None, None
         try:
-            location = self.geocoder.geocode(location_text)
-            if location:
+            lat, lng = geocode(location_text)
+            if lat is not None:
                 logger.debug(
                     "voice_agent_geocode_ok location=%s lat=%.6f lng=%.6f",
                     location_text[:80],
-                    location.latitude,
-                    location.longitude,
+                    lat,
+                    lng,
                 )
-                return location.latitude, location.longitude
+                return lat, lng
         except (GeocoderTimedOut, GeocoderServiceError) as e:
             logger.warning("voice_agent_geocode_error location=%s error=%s", location_text, e)
         except Exception as e:
@@ -0,0 +1,7 @@
+-- Cache of Google Maps geocoding results, keyed by normalized (trimmed, lowercased) location text
+CREATE TABLE IF NOT EXISTS geocode_cache (
+    location_text TEXT PRIMARY KEY,
+    latitude DOUBLE PRECISION NOT NULL,
+    longitude DOUBLE PRECISION NOT NULL,
+    cached_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
@@ -0,0 +1,15 @@
+-- Row timestamps always come from their DEFAULT now(); make them NOT NULL so inserts can rely on it
+UPDATE "case" SET created_at = now() WHERE created_at IS NULL;
+UPDATE "case" SET updated_at = created_at WHERE updated_at IS NULL;
+UPDATE text_message SET created_at = now() WHERE created_at IS NULL;
+UPDATE resource SET created_at = now() WHERE created_at IS NULL;
+
+ALTER TABLE "case"
+  ALTER COLUMN created_at SET NOT NULL,
+  ALTER COLUMN updated_at SET NOT NULL;
+
+ALTER TABLE text_message
+  ALTER COLUMN created_at SET NOT NULL;
+
+ALTER TABLE resource
+  ALTER COLUMN created_at SET NOT NULL;
@@ -0,0 +1,5 @@
+-- SMS conversation history is read as "latest 10 rows for this phone before time T": serve it from
+-- one backward index range scan instead of sorting every row for the number.
+-- Single statement so the runner sends it outside a transaction block, as CONCURRENTLY requires.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_text_message_target_created_at
+  ON text_message (target, created_at DESC);
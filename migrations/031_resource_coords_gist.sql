@@ -0,0 +1,9 @@
+-- Proximity search over resources: a point column (latitude, longitude) with a GiST index, so
+-- "nearest first" is an index-ordered k-NN walk (ORDER BY coords <-> point) instead of computing
+-- SQRT(POWER(...)) for every row and sorting. <-> is the same planar degree distance as before.
+ALTER TABLE resource
+ADD COLUMN IF NOT EXISTS coords POINT GENERATED ALWAYS AS (point(latitude, longitude)) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_resource_coords ON resource USING GIST (coords);
+
+COMMENT ON COLUMN resource.coords IS 'point(latitude, longitude) for GiST k-NN proximity queries';
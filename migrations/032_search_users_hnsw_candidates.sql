@@ -0,0 +1,98 @@
+-- RPC: rank users from the nearest specialities found through the HNSW index instead of computing
+-- the cosine distance of every ethan_user_speciality row. The 200 specialities closest to the query
+-- (approximate, via idx_ethan_user_speciality_embedding) are the candidates; only their users are
+-- scored by location + semantic distance. This trades recall: candidates ignore location, so a nearby
+-- responder outside the top 200 is never returned, and busy or unlocated candidates can leave fewer
+-- than match_count rows (036 widens the set and falls back to the exact scan).
+-- The geographic distance is computed once per user.
+
+DROP FUNCTION IF EXISTS search_users_by_embedding_and_location(vector(1536), double precision, double precision, integer, uuid);
+
+CREATE OR REPLACE FUNCTION search_users_by_embedding_and_location(
+  query_embedding vector(1536),
+  lat double precision,
+  lng double precision,
+  match_count int DEFAULT 10,
+  p_case_id UUID DEFAULT NULL
+)
+RETURNS TABLE (
+  id UUID,
+  name VARCHAR(255),
+  phone VARCHAR(64),
+  role user_role,
+  status user_status,
+  location VARCHAR(255),
+  latitude DOUBLE PRECISION,
+  longitude DOUBLE PRECISION,
+  last_location_update TIMESTAMPTZ,
+  created_at TIMESTAMPTZ,
+  maps_url TEXT,
+  notified_for_case boolean,
+  accepted_for_case boolean,
+  skills TEXT[],
+  distance_km DOUBLE PRECISION
+)
+LANGUAGE sql
+STABLE
+SET hnsw.ef_search = 200
+AS $$
+  WITH candidates AS (
+    -- Walks the HNSW index on embedding (vector_cosine_ops) nearest-first; LIMIT must not exceed
+    -- hnsw.ef_search (set on the function) or the index scan returns fewer rows
+    SELECT e.user_id, e.embedding <=> query_embedding AS dist
+    FROM ethan_user_speciality e
+    WHERE e.embedding IS NOT NULL
+    ORDER BY e.embedding <=> query_embedding
+    LIMIT 200
+  ),
+  user_semantic AS (
+    SELECT c.user_id, MIN(c.dist) AS sem_dist
+    FROM candidates c
+    GROUP BY c.user_id
+  ),
+  located AS (
+    SELECT
+      u.id,
+      s.sem_dist,
+      SQRT(POWER(u.latitude - lat, 2) + POWER(u.longitude - lng, 2)) * 111.0 AS distance_km
+    FROM "user" u
+    INNER JOIN user_semantic s ON s.user_id = u.id
+    WHERE u.latitude IS NOT NULL AND u.longitude IS NOT NULL
+      AND NOT EXISTS (
+        SELECT 1 FROM responder_assignment ra
+        WHERE ra.responder_id = u.id AND ra.status = 'accepted'
+          AND (p_case_id IS NULL OR ra.case_id != p_case_id)
+      )
+  ),
+  scored AS (
+    SELECT l.id, l.distance_km, 0.5 * (l.distance_km / 100.0) + 0.5 * (l.sem_dist / 2.0) AS combined
+    FROM located l
+  )
+  SELECT
+    u.id,
+    u.name,
+    u.phone,
+    u.role,
+    u.status,
+    u.location,
+    u.latitude,
+    u.longitude,
+    u.last_location_update,
+    u.created_at,
+    u.maps_url,
+    (p_case_id IS NOT NULL AND EXISTS (
+      SELECT 1 FROM responder_assignment ra
+      WHERE ra.responder_id = u.id AND ra.case_id = p_case_id
+    )) AS notified_for_case,
+    (p_case_id IS NOT NULL AND EXISTS (
+      SELECT 1 FROM responder_assignment ra
+      WHERE ra.responder_id = u.id AND ra.case_id = p_case_id AND ra.status = 'accepted'
+    )) AS accepted_for_case,
+    (SELECT array_agg(e.speciality ORDER BY (e.embedding <=> query_embedding) NULLS LAST)
+     FROM ethan_user_speciality e WHERE e.user_id = u.id) AS skills,
+    sc.distance_km
+  FROM "user" u
+  INNER JOIN scored sc ON sc.id = u.id
+  ORDER BY sc.combined ASC
+  LIMIT match_count;
+$$;
@@ -0,0 +1,5 @@
+-- Resource type filter (/resources, /resources/nearest) is "name ILIKE '%type%'": a trigram GIN
+-- index serves the leading-wildcard match instead of lowering and scanning every name.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_resource_name_trgm ON resource USING gin (name gin_trgm_ops);
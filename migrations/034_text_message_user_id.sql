@@ -0,0 +1,4 @@
+-- /cases for a victim looks up the cases linked to their own messages: seek text_message by user_id
+-- (event.text_message_id is already indexed by 008) instead of scanning every message.
+-- Single statement so the runner sends it outside a transaction block, as CONCURRENTLY requires.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_text_message_user_id ON text_message (user_id);
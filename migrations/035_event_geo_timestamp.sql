@@ -0,0 +1,7 @@
+-- /events/live reads the newest N geolocated events: a partial index in timestamp order lets the
+-- planner walk it backwards and stop at LIMIT instead of sorting every event. description is not
+-- INCLUDEd: free text can exceed the btree tuple size limit.
+-- Single statement so the runner sends it outside a transaction block, as CONCURRENTLY requires.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_event_geo_timestamp
+  ON event ("timestamp" DESC) INCLUDE (case_id, latitude, longitude)
+  WHERE latitude IS NOT NULL AND longitude IS NOT NULL;
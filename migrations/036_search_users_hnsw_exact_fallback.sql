@@ -0,0 +1,110 @@
+-- RPC: widen the HNSW candidate set from 032 and fall back to the exact scan when it is too small.
+-- 032 took only the 200 specialities nearest the query worldwide, ignoring location; when the users
+-- behind them were busy or had no coordinates the search could return fewer than match_count rows.
+-- Candidates are now the 1000 nearest specialities (the hnsw.ef_search maximum). If fewer than
+-- match_count eligible users come out of them, every speciality is scored exactly, as before 032.
+-- Remaining trade-off: while the candidates do fill match_count, a nearby responder whose closest
+-- speciality ranks below the top 1000 semantically is not considered.
+
+CREATE OR REPLACE FUNCTION search_users_by_embedding_and_location(
+  query_embedding vector(1536),
+  lat double precision,
+  lng double precision,
+  match_count int DEFAULT 10,
+  p_case_id UUID DEFAULT NULL
+)
+RETURNS TABLE (
+  id UUID,
+  name VARCHAR(255),
+  phone VARCHAR(64),
+  role user_role,
+  status user_status,
+  location VARCHAR(255),
+  latitude DOUBLE PRECISION,
+  longitude DOUBLE PRECISION,
+  last_location_update TIMESTAMPTZ,
+  created_at TIMESTAMPTZ,
+  maps_url TEXT,
+  notified_for_case boolean,
+  accepted_for_case boolean,
+  skills TEXT[],
+  distance_km DOUBLE PRECISION
+)
+LANGUAGE sql
+STABLE
+SET hnsw.ef_search = 1000
+AS $$
+  WITH eligible AS (
+    -- Located users not already accepted on another case; the geographic distance is computed once
+    SELECT
+      u.id,
+      SQRT(POWER(u.latitude - lat, 2) + POWER(u.longitude - lng, 2)) * 111.0 AS distance_km
+    FROM "user" u
+    WHERE u.latitude IS NOT NULL AND u.longitude IS NOT NULL
+      AND NOT EXISTS (
+        SELECT 1 FROM responder_assignment ra
+        WHERE ra.responder_id = u.id AND ra.status = 'accepted'
+          AND (p_case_id IS NULL OR ra.case_id != p_case_id)
+      )
+  ),
+  candidates AS (
+    -- Walks the HNSW index on embedding (vector_cosine_ops) nearest-first; LIMIT must not exceed
+    -- hnsw.ef_search (set on the function) or the index scan returns fewer rows
+    SELECT e.user_id, e.embedding <=> query_embedding AS dist
+    FROM ethan_user_speciality e
+    WHERE e.embedding IS NOT NULL
+    ORDER BY e.embedding <=> query_embedding
+    LIMIT 1000
+  ),
+  approx AS (
+    SELECT el.id, el.distance_km, MIN(c.dist) AS sem_dist
+    FROM candidates c
+    INNER JOIN eligible el ON el.id = c.user_id
+    GROUP BY el.id, el.distance_km
+  ),
+  exact AS (
+    -- Only runs when the candidates came up short: the count is a one-time filter on the scan
+    SELECT el.id, el.distance_km, MIN(e.embedding <=> query_embedding) AS sem_dist
+    FROM ethan_user_speciality e
+    INNER JOIN eligible el ON el.id = e.user_id
+    WHERE e.embedding IS NOT NULL
+      AND (SELECT COUNT(*) FROM approx) < match_count
+    GROUP BY el.id, el.distance_km
+  ),
+  located AS (
+    SELECT * FROM approx WHERE (SELECT COUNT(*) FROM approx) >= match_count
+    UNION ALL
+    SELECT * FROM exact
+  ),
+  scored AS (
+    SELECT l.id, l.distance_km, 0.5 * (l.distance_km / 100.0) + 0.5 * (l.sem_dist / 2.0) AS combined
+    FROM located l
+  )
+  SELECT
+    u.id,
+    u.name,
+    u.phone,
+    u.role,
+    u.status,
+    u.location,
+    u.latitude,
+    u.longitude,
+    u.last_location_update,
+    u.created_at,
+    u.maps_url,
+    (p_case_id IS NOT NULL AND EXISTS (
+      SELECT 1 FROM responder_assignment ra
+      WHERE ra.responder_id = u.id AND ra.case_id = p_case_id
+    )) AS notified_for_case,
+    (p_case_id IS NOT NULL AND EXISTS (
+      SELECT 1 FROM responder_assignment ra
+      WHERE ra.responder_id = u.id AND ra.case_id = p_case_id AND ra.status = 'accepted'
+    )) AS accepted_for_case,
+    (SELECT array_agg(e.speciality ORDER BY (e.embedding <=> query_embedding) NULLS LAST)
+     FROM ethan_user_speciality e WHERE e.user_id = u.id) AS skills,
+    sc.distance_km
+  FROM "user" u
+  INNER JOIN scored sc ON sc.id = u.id
+  ORDER BY sc.combined ASC
+  LIMIT match_count;
+$$;